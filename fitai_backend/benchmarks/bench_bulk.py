@@ -0,0 +1,91 @@
+"""
+bench_bulk.py — Workout import throughput: /workouts/bulk vs one /workouts/log per row
+Posts --rows synthetic sessions to a throwaway SQLite database as a JSON array
+and as NDJSON, and a smaller sample through /workouts/log, reporting rows/sec.
+
+Usage (from fitai_backend/):
+    py benchmarks/bench_bulk.py --rows 50000 --single 1000
+Requires httpx (pip install httpx).
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Point the app at a temporary database before database.db is imported
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}")
+sys.path.insert(0, BACKEND_DIR)
+
+import httpx
+from datetime import datetime, timedelta
+from fastapi import FastAPI
+from database import db as db_models
+from database.auth import access_token_for
+from routers import workouts
+
+EXERCISES = ["Running", "Cycling", "Push-ups", "Squats", "Plank", "Yoga", "Rowing"]
+
+
+def make_rows(n):
+    rng = random.Random(0)
+    start = datetime(2024, 1, 1)
+    return [{"exercise": rng.choice(EXERCISES), "duration": rng.randint(10, 90),
+             "calories": round(rng.uniform(50, 800), 1), "sets": 3, "reps": 12,
+             "logged_at": (start + timedelta(minutes=37 * i)).isoformat()}
+            for i in range(n)]
+
+
+def report(label, n, elapsed):
+    print(f"{label:>14}: {n:7d} rows in {elapsed:6.2f}s  {n / elapsed:10.1f} rows/sec")
+
+
+async def main(args):
+    db_models.create_tables()
+    with db_models.SessionLocal() as db:
+        user = db_models.User(name="sync", email="sync@bench.local", password_hash="x")
+        db.add(user)
+        db.commit()
+        token = access_token_for(user)
+
+    app = FastAPI()
+    app.include_router(workouts.router)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None,
+                                 headers={"Authorization": f"Bearer {token}"}) as client:
+        rows = make_rows(args.rows)
+
+        start = time.perf_counter()
+        r = await client.post("/workouts/bulk", json=rows)
+        report("bulk (json)", args.rows, time.perf_counter() - start)
+        assert r.status_code == 200 and r.json()["n_ok"] == args.rows, r.text[:500]
+
+        body = "\n".join(json.dumps(row) for row in rows)
+        start = time.perf_counter()
+        r = await client.post("/workouts/bulk", content=body,
+                              headers={"Content-Type": "application/x-ndjson"})
+        report("bulk (ndjson)", args.rows, time.perf_counter() - start)
+        assert r.status_code == 200 and r.json()["n_ok"] == args.rows, r.text[:500]
+
+        start = time.perf_counter()
+        for row in rows[:args.single]:
+            r = await client.post("/workouts/log", json=row)
+            assert r.status_code == 200, r.text
+        report("/workouts/log", args.single, time.perf_counter() - start)
+
+        stats = (await client.get("/workouts/stats")).json()
+        assert stats["total_sessions"] == 2 * args.rows + args.single, stats
+    await db_models.async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--single", type=int, default=1000, help="rows sent one request each")
+    print(f"SQLite profile: {db_models.SQLITE_PROFILE}")
+    asyncio.run(main(parser.parse_args()))
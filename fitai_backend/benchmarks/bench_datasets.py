@@ -0,0 +1,68 @@
+"""
+bench_datasets.py — Cold-load time of the bundled CSV datasets: CSV parse vs Feather snapshot
+Loads bodyPerformance.csv, nutrition.csv and calories.csv through
+models.data_loader with the in-process cache cleared before every load, first
+parsing the CSVs and then from the memory-mapped snapshots (written to a
+throwaway directory), and checks that both give identical frames.
+
+Usage (from fitai_backend/):
+    py benchmarks/bench_datasets.py --repeat 20
+Requires pyarrow (pip install pyarrow).
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+BACKEND_DIR  = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FRONTEND_DIR = os.path.join(BACKEND_DIR, "..", "fitness_ai_app_final")
+
+# Keep the benchmark's snapshots out of the real cache directory
+os.environ.setdefault("FITAI_DATASET_CACHE", tempfile.mkdtemp())
+sys.path.insert(0, FRONTEND_DIR)
+
+import pandas as pd
+from models import data_loader
+
+LOADERS = {
+    "bodyPerformance": data_loader.load_body_performance,
+    "nutrition":       data_loader.load_nutrition,
+    "calories":        data_loader.exercise_load,
+}
+
+
+def cold_load(loader, repeat):
+    times = []
+    for _ in range(repeat):
+        data_loader.clear_cache()
+        start = time.perf_counter()
+        df, ok = loader()
+        times.append(time.perf_counter() - start)
+        assert ok, "dataset failed to load"
+    return df, statistics.median(times)
+
+
+def main(args):
+    if data_loader.feather is None:
+        sys.exit("pyarrow is not installed — snapshots are disabled")
+    print(f"{'dataset':>16} {'rows':>7} {'csv ms':>9} {'snapshot ms':>12} {'speedup':>8}")
+    for name, loader in LOADERS.items():
+        data_loader.SNAPSHOTS = False
+        csv_df, csv_time = cold_load(loader, args.repeat)
+
+        data_loader.SNAPSHOTS = True
+        data_loader.clear_cache()
+        loader()   # first load parses the CSV and writes the snapshot
+        snap_df, snap_time = cold_load(loader, args.repeat)
+
+        pd.testing.assert_frame_equal(csv_df, snap_df)
+        print(f"{name:>16} {len(csv_df):7d} {csv_time * 1000:9.2f} {snap_time * 1000:12.2f} "
+              f"{csv_time / snap_time:7.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=20)
+    main(parser.parse_args())
@@ -0,0 +1,112 @@
+"""
+bench_db.py — Concurrent-request load test for the database-backed routers
+Seeds a throwaway SQLite database with users and workouts, then drives a mix
+of /workouts/log, /workouts/history, /workouts/stats and /profile/me at
+increasing concurrency and reports requests/sec and latency percentiles.
+
+Usage (from fitai_backend/):
+    py benchmarks/bench_db.py --users 50 --workouts 200 --requests 2000
+Requires httpx (pip install httpx).
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Point the app at a temporary database before database.db is imported
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}")
+sys.path.insert(0, BACKEND_DIR)
+
+import httpx
+from datetime import datetime, timedelta
+from fastapi import FastAPI
+from database import db as db_models
+from database import summary
+from database.auth import access_token_for
+from routers import profile, workouts
+
+EXERCISES = ["Running", "Cycling", "Push-ups", "Squats", "Plank", "Yoga"]
+
+
+def seed(n_users, n_workouts):
+    db_models.create_tables()
+    now = datetime.utcnow()
+    with db_models.SessionLocal() as db:
+        users = [db_models.User(name=f"user{i}", email=f"user{i}@bench.local",
+                                password_hash="x") for i in range(n_users)]
+        db.add_all(users)
+        db.flush()
+        for u in users:
+            db.add(db_models.UserProfile(user_id=u.id, age=30, gender="Male", weight=75,
+                                         height=178, goal="Stay Fit", activity_level="",
+                                         experience="Intermediate", bmi=23.7,
+                                         bmi_category="Normal Weight", bmr=1700, tdee=2600))
+            db.add_all(db_models.WorkoutHistory(
+                user_id=u.id, exercise=random.choice(EXERCISES), duration=30,
+                calories=250.0, sets=3, reps=12, logged_at=now - timedelta(hours=j))
+                for j in range(n_workouts))
+        db.commit()
+        summary.rebuild()
+        return [access_token_for(u) for u in users]
+
+
+async def run(client, tokens, n_requests, concurrency):
+    sem = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(i):
+        headers = {"Authorization": f"Bearer {tokens[i % len(tokens)]}"}
+        kind = i % 10
+        async with sem:
+            start = time.perf_counter()
+            if kind < 2:
+                r = await client.post("/workouts/log", headers=headers, json={
+                    "exercise": "Running", "duration": 30, "calories": 250.0,
+                    "sets": 1, "reps": 1})
+            elif kind < 6:
+                r = await client.get("/workouts/history", headers=headers)
+            elif kind < 8:
+                r = await client.get("/workouts/stats", headers=headers)
+            else:
+                r = await client.get("/profile/me", headers=headers)
+            latencies.append(time.perf_counter() - start)
+            assert r.status_code == 200, r.text
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(n_requests)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] * 1000
+    p95 = latencies[int(len(latencies) * 0.95)] * 1000
+    print(f"{concurrency:>12} {n_requests / elapsed:10.1f} {p50:9.1f} {p95:9.1f}")
+
+
+async def main(args):
+    tokens = seed(args.users, args.workouts)
+    app = FastAPI()
+    app.include_router(profile.router)
+    app.include_router(workouts.router)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await run(client, tokens, len(tokens), 1)   # warm up the pool and the token cache
+        print(f"{'concurrency':>12} {'req/sec':>10} {'p50 ms':>9} {'p95 ms':>9}")
+        for c in args.concurrency:
+            await run(client, tokens, args.requests, c)
+    await db_models.async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--workouts", type=int, default=200, help="seeded workouts per user")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32, 128])
+    args = parser.parse_args()
+    print(f"Database: {db_models.DATABASE_URL}  (pool_size={db_models.DB_POOL_SIZE}, "
+          f"max_overflow={db_models.DB_MAX_OVERFLOW})")
+    asyncio.run(main(args))
@@ -0,0 +1,98 @@
+"""
+bench_food_search.py — Food search latency: FoodIndex vs a linear str.contains scan
+Builds a synthetic USDA-style table of --foods names (300k by default), then
+times typical queries (whole words, prefixes, multi-word, typos, 1-2 letter
+substrings) through models.food_search and through the old
+lowercase-and-scan approach.
+
+Usage (from fitai_backend/):
+    py benchmarks/bench_food_search.py --foods 300000 --repeat 50
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+BACKEND_DIR  = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FRONTEND_DIR = os.path.join(BACKEND_DIR, "..", "fitness_ai_app_final")
+sys.path.insert(0, FRONTEND_DIR)
+
+import pandas as pd
+from models.food_search import FoodIndex
+
+BASES = ["chicken", "beef", "pork", "turkey", "salmon", "tuna", "cod", "egg", "milk", "cheese",
+         "yogurt", "rice", "wheat", "oats", "barley", "corn", "potato", "tomato", "spinach",
+         "broccoli", "carrot", "apple", "banana", "orange", "grape", "almond", "peanut", "lentil",
+         "chickpea", "bean", "tofu", "paneer", "bread", "pasta", "noodle", "soup", "butter", "oil"]
+PARTS = ["breast", "thigh", "wing", "fillet", "ground", "whole", "white", "brown", "green",
+         "sweet", "baby", "cheddar", "greek", "kidney", "black", "roma", "navel", "red"]
+PREPS = ["raw", "boiled", "grilled", "roasted", "fried", "baked", "steamed", "canned",
+         "frozen", "dried", "smoked", "cooked", "stewed", "mashed", "toasted"]
+EXTRAS = ["with salt", "without salt", "low fat", "fat free", "reduced sodium", "drained",
+          "skin not eaten", "enriched", "unsweetened", "with added vitamin d", "lean only"]
+BRANDS = [f"brand{i}" for i in range(2000)]
+
+QUERIES = {
+    "word":       ["chicken", "banana", "paneer", "salmon", "oats"],
+    "prefix":     ["chi", "ban", "sal", "bro", "pot"],
+    "multi-word": ["chicken breast grilled", "brown rice", "greek yogurt low fat", "kidney bean canned"],
+    "typo":       ["chiken", "bananna", "brocoli", "yoghurt", "salmn"],
+    "short":      ["an", "ch", "ee", "ol"],
+}
+
+
+def make_names(n):
+    rng = random.Random(0)
+    names = []
+    for _ in range(n):
+        parts = [rng.choice(BASES).capitalize()]
+        if rng.random() < 0.6:
+            parts.append(rng.choice(PARTS))
+        parts.append(rng.choice(PREPS))
+        if rng.random() < 0.5:
+            parts.append(rng.choice(EXTRAS))
+        if rng.random() < 0.3:
+            parts.append(rng.choice(BRANDS).upper())
+        names.append(", ".join(parts))
+    return names
+
+
+def timed(fn, queries, repeat):
+    times = []
+    for _ in range(repeat):
+        for q in queries:
+            start = time.perf_counter()
+            fn(q)
+            times.append(time.perf_counter() - start)
+    times.sort()
+    return statistics.median(times) * 1000, times[int(len(times) * 0.95)] * 1000
+
+
+def main(args):
+    names = make_names(args.foods)
+    df = pd.DataFrame({"food_name": names})
+
+    start = time.perf_counter()
+    index = FoodIndex(df["food_name"].tolist())
+    print(f"{args.foods} foods, {len(index.vocab)} distinct tokens — "
+          f"index built in {time.perf_counter() - start:.2f}s")
+
+    def scan(q):
+        return df[df["food_name"].str.lower().str.contains(q.lower(), na=False)].head(10)
+
+    print(f"{'queries':>12} {'index p50':>10} {'index p95':>10} {'scan p50':>10}   (ms)")
+    for kind, queries in QUERIES.items():
+        p50, p95 = timed(lambda q: index.search(q, 10), queries, args.repeat)
+        scan_p50, _ = timed(scan, queries, max(1, args.repeat // 25))
+        print(f"{kind:>12} {p50:10.3f} {p95:10.3f} {scan_p50:10.1f}")
+    for q in ["chiken breast", "brocoli steamed"]:
+        print(f"  {q!r}: {[names[i] for i in index.search(q, 3)]}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--foods", type=int, default=300_000)
+    parser.add_argument("--repeat", type=int, default=50)
+    main(parser.parse_args())
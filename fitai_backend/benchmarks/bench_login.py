@@ -0,0 +1,79 @@
+"""
+bench_login.py — Login throughput with thread-pool vs process-pool password hashing
+Seeds a throwaway SQLite database with users, then fires concurrent
+/auth/login requests at the app in-process and reports requests/sec.
+
+Usage (from fitai_backend/):
+    py benchmarks/bench_login.py --users 200 --requests 400 --concurrency 32
+Requires httpx (pip install httpx).
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run(pool_size, args):
+    os.environ["HASH_POOL_SIZE"] = str(pool_size)
+    # Point the app at a temporary database before database.db is imported
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    sys.path.insert(0, BACKEND_DIR)
+    import httpx
+    from database import db as db_models
+    from database.auth import hash_password, shutdown_hash_pool
+    from routers import auth
+
+    db_models.create_tables()
+
+    pw_hash = hash_password("password123")
+    with db_models.SessionLocal() as db:
+        db.add_all([db_models.User(name=f"user{i}", email=f"user{i}@bench.local",
+                                   password_hash=pw_hash) for i in range(args.users)])
+        db.commit()
+
+    from fastapi import FastAPI
+    app = FastAPI()
+    app.include_router(auth.router)
+
+    async def main():
+        sem = asyncio.Semaphore(args.concurrency)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            async def one(i):
+                async with sem:
+                    r = await client.post("/auth/login", json={
+                        "email": f"user{i % args.users}@bench.local", "password": "password123"})
+                    assert r.status_code == 200, r.text
+            await one(0)   # warm up the pool
+            start = time.perf_counter()
+            await asyncio.gather(*(one(i) for i in range(args.requests)))
+            return time.perf_counter() - start
+
+    elapsed = asyncio.run(main())
+    shutdown_hash_pool()
+    label = "threads" if pool_size <= 0 else f"pool={pool_size}"
+    print(f"{label:>10}: {args.requests / elapsed:8.1f} logins/sec  ({elapsed:.2f}s)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--pool-size", type=int, default=None,
+                        help="run a single configuration (0 = default thread pool)")
+    args = parser.parse_args()
+
+    if args.pool_size is not None:
+        run(args.pool_size, args)
+    else:
+        # Each configuration in a fresh interpreter so module-level config is re-read
+        common = ["--users", str(args.users), "--requests", str(args.requests),
+                  "--concurrency", str(args.concurrency)]
+        for size in (0, os.cpu_count() or 1):
+            subprocess.run([sys.executable, __file__, "--pool-size", str(size)] + common, check=True)
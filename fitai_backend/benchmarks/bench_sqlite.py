@@ -0,0 +1,97 @@
+"""
+bench_sqlite.py — Mixed read/write throughput under each SQLite pragma profile
+Several worker processes share one throwaway SQLite file, as uvicorn workers
+would. Each one loops for a fixed time: a share of the iterations log a
+workout and commit, and the rest read a page of history. Reports reads/sec,
+writes/sec and how many operations failed with "database is locked".
+
+Usage (from fitai_backend/):
+    py benchmarks/bench_sqlite.py --workers 8 --seconds 10 --write-ratio 0.2
+"""
+import argparse
+import multiprocessing as mp
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+N_USERS = 50
+
+
+def worker(seed, args, results):
+    sys.path.insert(0, BACKEND_DIR)
+    from sqlalchemy.exc import OperationalError
+    from database import db as db_models
+
+    rng = random.Random(seed)
+    reads = writes = locked = 0
+    deadline = time.perf_counter() + args.seconds
+    with db_models.SessionLocal() as db:
+        while time.perf_counter() < deadline:
+            user_id = rng.randint(1, N_USERS)
+            try:
+                if rng.random() < args.write_ratio:
+                    db.add(db_models.WorkoutHistory(user_id=user_id, exercise="Running",
+                                                    duration=30, calories=250.0, sets=1, reps=1))
+                    db.commit()
+                    writes += 1
+                else:
+                    db.query(db_models.WorkoutHistory).filter(
+                        db_models.WorkoutHistory.user_id == user_id
+                    ).order_by(db_models.WorkoutHistory.logged_at.desc()).limit(20).all()
+                    db.rollback()   # end the read transaction, as a request would
+                    reads += 1
+            except OperationalError:
+                db.rollback()
+                locked += 1
+    results.put((reads, writes, locked))
+
+
+def run(profile, args):
+    os.environ["SQLITE_PROFILE"] = profile
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    sys.path.insert(0, BACKEND_DIR)
+    from database import db as db_models
+
+    db_models.create_tables()
+    with db_models.SessionLocal() as db:
+        db.add_all([db_models.User(name=f"user{i}", email=f"user{i}@bench.local",
+                                   password_hash="x") for i in range(N_USERS)])
+        db.add_all([db_models.WorkoutHistory(user_id=i % N_USERS + 1, exercise="Running",
+                                             duration=30, calories=250.0, sets=1, reps=1)
+                    for i in range(args.rows)])
+        db.commit()
+    db_models.engine.dispose()   # workers open their own connections
+
+    results = mp.Queue()
+    procs = [mp.Process(target=worker, args=(i, args, results)) for i in range(args.workers)]
+    for p in procs:
+        p.start()
+    totals = [sum(t) for t in zip(*(results.get() for _ in procs))]
+    for p in procs:
+        p.join()
+    reads, writes, locked = totals
+    print(f"{profile:>11}: {reads / args.seconds:9.1f} reads/sec {writes / args.seconds:9.1f} writes/sec"
+          f"  {locked:6d} locked errors")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    parser.add_argument("--rows", type=int, default=20000, help="workouts seeded before the run")
+    parser.add_argument("--profile", default=None, help="run a single SQLITE_PROFILE")
+    args = parser.parse_args()
+
+    if args.profile is not None:
+        run(args.profile, args)
+    else:
+        # Each profile in a fresh interpreter so module-level config is re-read
+        common = ["--workers", str(args.workers), "--seconds", str(args.seconds),
+                  "--write-ratio", str(args.write_ratio), "--rows", str(args.rows)]
+        for profile in ("default", "production"):
+            subprocess.run([sys.executable, __file__, "--profile", profile] + common, check=True)
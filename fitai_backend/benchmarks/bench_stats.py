@@ -0,0 +1,115 @@
+"""
+bench_stats.py — /workouts/stats latency for a user with a very long history
+Seeds one user with --sessions workouts (100k by default) in a throwaway
+SQLite database, checks that the endpoint (served from user_workout_summary)
+returns exactly the same JSON as the old load-every-row implementation, and
+times both.
+
+Usage (from fitai_backend/):
+    py benchmarks/bench_stats.py --sessions 100000 --repeat 20
+Requires httpx (pip install httpx).
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from collections import Counter
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Point the app at a temporary database before database.db is imported
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}")
+sys.path.insert(0, BACKEND_DIR)
+
+import httpx
+from datetime import datetime, timedelta
+from fastapi import FastAPI
+from database import db as db_models
+from database import summary
+from database.auth import access_token_for
+from routers import workouts
+
+EXERCISES = ["Running", "Cycling", "Push-ups", "Squats", "Plank", "Yoga", "Rowing"]
+
+
+def seed(n_sessions):
+    db_models.create_tables()
+    rng = random.Random(0)
+    now = datetime.utcnow()
+    with db_models.SessionLocal() as db:
+        user = db_models.User(name="heavy", email="heavy@bench.local", password_hash="x")
+        db.add(user)
+        db.flush()
+        db.execute(db_models.WorkoutHistory.__table__.insert(), [
+            {"user_id": user.id, "exercise": rng.choice(EXERCISES), "duration": rng.randint(10, 90),
+             "calories": round(rng.uniform(50, 800), 1), "sets": 3, "reps": 12,
+             "logged_at": now - timedelta(minutes=i)}
+            for i in range(n_sessions)])
+        db.commit()
+        user_id, token = user.id, access_token_for(user)
+    summary.rebuild()   # rows were inserted behind the summary's back
+    return user_id, token
+
+
+def legacy_stats(user_id):
+    """The previous implementation: hydrate every row, aggregate in Python."""
+    with db_models.SessionLocal() as db:
+        # Rows in id order, as the unindexed table scan returned them (decides ties)
+        rows = db.query(db_models.WorkoutHistory).filter(
+            db_models.WorkoutHistory.user_id == user_id).order_by(db_models.WorkoutHistory.id).all()
+    total_cal  = round(sum(w.calories for w in rows), 1)
+    total_mins = sum(w.duration for w in rows)
+    fav = Counter(w.exercise for w in rows).most_common(1)[0][0]
+    return {
+        "total_sessions":    len(rows),
+        "total_calories":    total_cal,
+        "total_minutes":     total_mins,
+        "favourite_exercise": fav,
+        "avg_calories_per_session": round(total_cal / len(rows), 1),
+        "avg_duration":      round(total_mins / len(rows), 1),
+    }
+
+
+def report(label, times):
+    print(f"{label:>8}: median {statistics.median(times) * 1000:8.1f} ms   "
+          f"max {max(times) * 1000:8.1f} ms")
+
+
+async def main(args):
+    user_id, token = seed(args.sessions)
+    app = FastAPI()
+    app.include_router(workouts.router)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench",
+                                 headers={"Authorization": f"Bearer {token}"}) as client:
+        stats = (await client.get("/workouts/stats")).json()
+        legacy = legacy_stats(user_id)
+        assert stats == legacy, f"mismatch:\n  endpoint {stats}\n  legacy   {legacy}"
+        print(f"{args.sessions} sessions — identical JSON: {stats}")
+
+        times = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            legacy_stats(user_id)
+            times.append(time.perf_counter() - start)
+        report("python", times)
+
+        times = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            r = await client.get("/workouts/stats")
+            times.append(time.perf_counter() - start)
+            assert r.status_code == 200, r.text
+        report("summary", times)
+    await db_models.async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    asyncio.run(main(parser.parse_args()))
@@ -1,15 +1,26 @@
 from passlib.context import CryptContext
+import hashlib
 from jose import JWTError, jwt
 from datetime import datetime, timedelta
+from collections import OrderedDict, namedtuple
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
-from database.db import get_db
+from sqlalchemy import event, inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+from database.db import get_async_db
 import database.db as db_models
+from concurrent.futures import ProcessPoolExecutor
+import asyncio
+import threading
+import time
+import os
 
 SECRET_KEY   = "fitai_secret_key_2025_bsc_project"
 ALGORITHM    = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24  # 24 hours
+TOKEN_CACHE_TTL  = int(os.getenv("TOKEN_CACHE_TTL", "300"))     # seconds
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "10000"))
+HASH_POOL_SIZE   = int(os.getenv("HASH_POOL_SIZE", str(min(4, os.cpu_count() or 1))))  # 0 = thread pool
 
 pwd_context   = CryptContext(schemes=["sha256_crypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
@@ -20,28 +31,190 @@ def hash_password(password: str) -> str:
 def verify_password(plain: str, hashed: str) -> bool:
     return pwd_context.verify(plain, hashed)
 
+# ── Hashing worker pool ────────────────────────────────────────────────────────
+# sha256_crypt runs thousands of rounds while holding the GIL, so it goes to
+# separate processes to keep the event loop free for other requests.
+_hash_pool      = None
+_hash_pool_lock = threading.Lock()
+
+def _get_hash_pool():
+    global _hash_pool
+    if _hash_pool is None:
+        with _hash_pool_lock:
+            if _hash_pool is None:
+                _hash_pool = ProcessPoolExecutor(max_workers=HASH_POOL_SIZE)
+    return _hash_pool
+
+async def _run_hashing(fn, *args):
+    # Without the process pool, hash on the loop's default thread pool: still
+    # GIL-bound, but the event loop keeps serving other requests between slices
+    pool = _get_hash_pool() if HASH_POOL_SIZE > 0 else None
+    return await asyncio.get_running_loop().run_in_executor(pool, fn, *args)
+
+async def hash_password_async(password: str) -> str:
+    return await _run_hashing(hash_password, password)
+
+async def verify_password_async(plain: str, hashed: str) -> bool:
+    return await _run_hashing(verify_password, plain, hashed)
+
+def shutdown_hash_pool():
+    global _hash_pool
+    if _hash_pool is not None:
+        _hash_pool.shutdown(wait=False, cancel_futures=True)
+        _hash_pool = None
+
 def create_access_token(data: dict) -> str:
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "iat": time.time()})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
-def get_current_user(token: str = Depends(oauth2_scheme),
-                     db: Session = Depends(get_db)):
-    credentials_exception = HTTPException(
+def password_version(password_hash: str) -> str:
+    """Short fingerprint of the stored hash; changes whenever the password does."""
+    return hashlib.sha256(password_hash.encode()).hexdigest()[:16]
+
+def access_token_for(user) -> str:
+    """Token for a User row. The `pwv` claim ties it to the current password."""
+    return create_access_token({"user_id": user.id, "email": user.email, "name": user.name,
+                                "pwv": password_version(user.password_hash)})
+
+# ── Authenticated principal cache ─────────────────────────────────────────────
+# Lightweight stand-in for the User row; routers only need id/email/name.
+Principal = namedtuple("Principal", ["id", "email", "name"])
+
+class TokenCache:
+    """Bounded LRU of token -> principal, each entry expiring after a TTL."""
+
+    def __init__(self, maxsize=TOKEN_CACHE_SIZE, ttl=TOKEN_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl     = ttl
+        self._data   = OrderedDict()   # token -> (principal, verified, expires_at)
+        self._lock   = threading.Lock()
+
+    def get(self, token, verified=True):
+        with self._lock:
+            entry = self._data.get(token)
+            if entry is None:
+                return None
+            principal, is_verified, expires_at = entry
+            if expires_at <= time.time():
+                del self._data[token]
+                return None
+            if verified and not is_verified:
+                return None
+            self._data.move_to_end(token)
+            return principal
+
+    def put(self, token, principal, token_exp, verified=True):
+        expires_at = min(time.time() + self.ttl, token_exp)
+        with self._lock:
+            self._data[token] = (principal, verified, expires_at)
+            self._data.move_to_end(token)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate_user(self, user_id):
+        with self._lock:
+            for token in [t for t, (p, _, _) in self._data.items() if p.id == user_id]:
+                del self._data[token]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+class RevocationList:
+    """user id -> time its earlier tokens were revoked (deleted user or new password).
+
+    Process-local: other workers only learn about a revocation through the
+    users table, i.e. in get_current_user. An entry is dropped once every
+    token issued before it has expired, so the list stays bounded.
+    """
+
+    def __init__(self, ttl=ACCESS_TOKEN_EXPIRE_MINUTES * 60):
+        self.ttl   = ttl
+        self._data = OrderedDict()   # user id -> revoked_at, oldest first
+        self._lock = threading.Lock()
+
+    def revoke(self, user_id):
+        now = time.time()
+        with self._lock:
+            self._data.pop(user_id, None)
+            self._data[user_id] = now
+            while self._data and next(iter(self._data.values())) <= now - self.ttl:
+                self._data.popitem(last=False)
+
+    def is_revoked(self, user_id, issued_at):
+        with self._lock:
+            revoked_at = self._data.get(user_id)
+        return revoked_at is not None and issued_at <= revoked_at
+
+token_cache = TokenCache()
+revoked     = RevocationList()
+
+@event.listens_for(db_models.User, "after_delete")
+def _user_deleted(mapper, connection, target):
+    revoked.revoke(target.id)
+    token_cache.invalidate_user(target.id)
+
+@event.listens_for(db_models.User, "after_update")
+def _user_updated(mapper, connection, target):
+    state = inspect(target)
+    if state.attrs["password_hash"].history.has_changes():
+        revoked.revoke(target.id)
+    if any(state.attrs[a].history.has_changes() for a in ("password_hash", "email", "name")):
+        token_cache.invalidate_user(target.id)
+
+# ── Dependencies ───────────────────────────────────────────────────────────────
+def _credentials_exception():
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Invalid or expired token",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+def _decode(token):
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: int = payload.get("user_id")
-        if user_id is None:
-            raise credentials_exception
     except JWTError:
-        raise credentials_exception
+        raise _credentials_exception()
+    if payload.get("user_id") is None:
+        raise _credentials_exception()
+    return payload
+
+async def get_current_user(token: str = Depends(oauth2_scheme),
+                           db: AsyncSession = Depends(get_async_db)) -> Principal:
+    """Principal for a token, checked against the users table once per TTL.
+
+    A token issued before the user's current password (its `pwv` claim no
+    longer matches) is rejected, in every worker.
+    """
+    principal = token_cache.get(token)
+    if principal is not None:
+        return principal
+
+    payload = _decode(token)
+    user = await db.get(db_models.User, payload["user_id"])
+    if user is None or payload.get("pwv") != password_version(user.password_hash):
+        raise _credentials_exception()
+    principal = Principal(user.id, user.email, user.name)
+    token_cache.put(token, principal, payload["exp"])
+    return principal
+
+async def get_token_claims(token: str = Depends(oauth2_scheme)) -> Principal:
+    """Principal built from the token claims alone — no database access.
+
+    For routes that need no user data beyond authentication (e.g. /ml/*).
+    Async because it never blocks, so it skips the threadpool hop. Without
+    the users table, deletions and password changes are only seen if they
+    happened in this process (see RevocationList).
+    """
+    principal = token_cache.get(token, verified=False)
+    if principal is not None:
+        return principal
 
-    user = db.query(db_models.User).filter(db_models.User.id == user_id).first()
-    if user is None:
-        raise credentials_exception
-    return user
+    payload = _decode(token)
+    if revoked.is_revoked(payload["user_id"], payload.get("iat", 0)):
+        raise _credentials_exception()
+    principal = Principal(payload["user_id"], payload.get("email"), payload.get("name"))
+    token_cache.put(token, principal, payload["exp"], verified=False)
+    return principal
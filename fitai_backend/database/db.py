@@ -1,14 +1,85 @@
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, ForeignKey, Text
+from sqlalchemy import create_engine, event, Column, Integer, String, Float, Date, DateTime, ForeignKey, Text
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
 from datetime import datetime
 import os
 
 BASE_DIR = os.path.dirname(os.path.dirname(__file__))
-DATABASE_URL = f"sqlite:///{os.path.join(BASE_DIR, 'fitai.db')}"
 
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+# ── Connection settings ────────────────────────────────────────────────────────
+# DATABASE_URL defaults to the local SQLite file; set it to a postgresql:// URL
+# (with psycopg2 + asyncpg installed) to run against Postgres.
+DATABASE_URL = os.getenv("DATABASE_URL", f"sqlite:///{os.path.join(BASE_DIR, 'fitai.db')}")
+if DATABASE_URL.startswith("postgres://"):
+    DATABASE_URL = "postgresql://" + DATABASE_URL[len("postgres://"):]
+
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+_scheme, _rest = DATABASE_URL.split("://", 1)
+ASYNC_DATABASE_URL = f"{ASYNC_DRIVERS.get(_scheme, _scheme)}://{_rest}"
+
+DB_POOL_SIZE    = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))   # seconds
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))     # seconds
+
+IS_SQLITE = DATABASE_URL.startswith("sqlite")
+POOL_ARGS = dict(pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW,
+                 pool_recycle=DB_POOL_RECYCLE, pool_timeout=DB_POOL_TIMEOUT,
+                 pool_pre_ping=not IS_SQLITE)
+
+# Sync engine — table creation, scripts and benchmarks
+engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False} if IS_SQLITE else {},
+                       poolclass=QueuePool, **POOL_ARGS)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Async engine — used by the API routers
+# (aiosqlite would default to NullPool — one new connection per request)
+async_engine = create_async_engine(ASYNC_DATABASE_URL, poolclass=AsyncAdaptedQueuePool, **POOL_ARGS)
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession,
+                                       autoflush=False, expire_on_commit=False)
+
+# ── SQLite pragma profile ──────────────────────────────────────────────────────
+# "production": WAL lets readers run alongside the single writer, synchronous=NORMAL
+# fsyncs only at checkpoints, and busy_timeout makes writers wait instead of
+# failing with "database is locked". "default" leaves SQLite's own settings.
+SQLITE_PROFILES = {
+    "default": {},
+    "production": {
+        "journal_mode": "WAL",
+        "synchronous":  "NORMAL",
+        "cache_size":   -64000,        # negative = KiB, i.e. 64 MB
+        "mmap_size":    268435456,     # 256 MB
+        "temp_store":   "MEMORY",
+        "busy_timeout": 5000,          # ms
+    },
+}
+SQLITE_PROFILE = os.getenv("SQLITE_PROFILE", "production")
+
+def sqlite_pragmas(profile=SQLITE_PROFILE, overrides=os.getenv("SQLITE_PRAGMAS", "")):
+    """Pragmas for a profile, with `name=value,...` overrides (e.g. from SQLITE_PRAGMAS)."""
+    if profile not in SQLITE_PROFILES:
+        raise ValueError(f"Unknown SQLITE_PROFILE {profile!r}; expected one of {sorted(SQLITE_PROFILES)}")
+    pragmas = dict(SQLITE_PROFILES[profile])
+    for item in filter(None, (i.strip() for i in overrides.split(","))):
+        name, _, value = (part.strip() for part in item.partition("="))
+        if not name.isidentifier() or not value.replace("-", "").isalnum():
+            raise ValueError(f"Invalid SQLite pragma override {item!r}")
+        pragmas[name.lower()] = value
+    return pragmas
+
+SQLITE_PRAGMAS = sqlite_pragmas() if IS_SQLITE else {}
+
+def _apply_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    for name, value in SQLITE_PRAGMAS.items():
+        cursor.execute(f"PRAGMA {name}={value}")
+    cursor.close()
+
+if SQLITE_PRAGMAS:
+    event.listen(engine, "connect", _apply_pragmas)
+    event.listen(async_engine.sync_engine, "connect", _apply_pragmas)
 Base = declarative_base()
 
 # ── Database Models ────────────────────────────────────────────────────────────
@@ -22,7 +93,9 @@ class User(Base):
     created_at    = Column(DateTime, default=datetime.utcnow)
 
     profile       = relationship("UserProfile", back_populates="user", uselist=False)
-    workouts      = relationship("WorkoutHistory", back_populates="user")
+    # Deleting a user deletes their workouts (rather than orphaning them with a
+    # NULL user_id), so workout_history and its summaries stay in step
+    workouts      = relationship("WorkoutHistory", back_populates="user", cascade="all, delete-orphan")
 
 class UserProfile(Base):
     __tablename__ = "user_profiles"
@@ -60,8 +133,35 @@ class WorkoutHistory(Base):
 
     user = relationship("User", back_populates="workouts")
 
+# Running totals kept in step with workout_history by database/summary.py
+class UserWorkoutSummary(Base):
+    __tablename__ = "user_workout_summary"
+    user_id        = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    sessions       = Column(Integer, nullable=False, default=0)
+    total_calories = Column(Float, nullable=False, default=0.0)
+    total_minutes  = Column(Integer, nullable=False, default=0)
+
+class UserExerciseSummary(Base):
+    __tablename__ = "user_exercise_summary"
+    user_id  = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    exercise = Column(String, primary_key=True)
+    sessions = Column(Integer, nullable=False, default=0)
+    first_id = Column(Integer, nullable=False)   # oldest workout id, breaks favourite ties
+
+# Per-user, per-day totals for /workouts/timeseries (UTC days)
+class UserDailyRollup(Base):
+    __tablename__ = "user_daily_rollup"
+    user_id        = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    day            = Column(Date, primary_key=True)
+    sessions       = Column(Integer, nullable=False, default=0)
+    total_calories = Column(Float, nullable=False, default=0.0)
+    total_minutes  = Column(Integer, nullable=False, default=0)
+
 def create_tables():
+    """Create missing tables, then apply pending migrations. Returns the migrations applied."""
     Base.metadata.create_all(bind=engine)
+    from database.migrations import run_migrations
+    return run_migrations(engine)
 
 def get_db():
     db = SessionLocal()
@@ -69,3 +169,7 @@ def get_db():
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,66 @@
+"""
+migrations.py — Ordered schema migrations for FitAI Pro
+create_all() only creates missing tables, so indexes and other changes to
+existing tables are applied here. Each migration runs once and is recorded
+in the schema_migrations table.
+"""
+from sqlalchemy import text
+from database.db import engine, IS_SQLITE
+
+_DAY_SQL = "date(logged_at)" if IS_SQLITE else "CAST(logged_at AS DATE)"
+
+# (version, description, statements) — append only, never edit an applied one.
+# SQL is spelled out here rather than imported, so later changes to the live
+# modules (e.g. database.summary) cannot alter a migration already applied.
+MIGRATIONS = [
+    (1, "workout_history (user_id, logged_at DESC, id DESC) index for history pages", [
+        "CREATE INDEX IF NOT EXISTS ix_workout_history_user_logged "
+        "ON workout_history (user_id, logged_at DESC, id DESC)",
+    ]),
+    (2, "backfill user_workout_summary and user_exercise_summary", [
+        "DELETE FROM user_exercise_summary",
+        "DELETE FROM user_workout_summary",
+        "INSERT INTO user_workout_summary (user_id, sessions, total_calories, total_minutes) "
+        "SELECT user_id, COUNT(*), COALESCE(SUM(calories), 0), COALESCE(SUM(duration), 0) "
+        "FROM workout_history GROUP BY user_id",
+        "INSERT INTO user_exercise_summary (user_id, exercise, sessions, first_id) "
+        "SELECT user_id, exercise, COUNT(*), MIN(id) FROM workout_history GROUP BY user_id, exercise",
+    ]),
+    (3, "backfill user_daily_rollup for /workouts/timeseries", [
+        "DELETE FROM user_daily_rollup",
+        "INSERT INTO user_daily_rollup (user_id, day, sessions, total_calories, total_minutes) "
+        f"SELECT user_id, {_DAY_SQL}, COUNT(*), COALESCE(SUM(calories), 0), COALESCE(SUM(duration), 0) "
+        f"FROM workout_history GROUP BY user_id, {_DAY_SQL}",
+    ]),
+]
+
+
+def applied_versions(conn):
+    conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS schema_migrations ("
+        "version INTEGER PRIMARY KEY, description VARCHAR NOT NULL, applied_at TIMESTAMP NOT NULL)"))
+    return {row[0] for row in conn.execute(text("SELECT version FROM schema_migrations"))}
+
+
+def run_migrations(bind=engine):
+    """Apply pending migrations in order, each in its own transaction. Returns the versions applied."""
+    applied = []
+    with bind.begin() as conn:
+        done = applied_versions(conn)
+    for version, description, statements in MIGRATIONS:
+        if version in done:
+            continue
+        with bind.begin() as conn:
+            for sql in statements:
+                conn.execute(text(sql))
+            conn.execute(text("INSERT INTO schema_migrations (version, description, applied_at) "
+                              "VALUES (:v, :d, CURRENT_TIMESTAMP)"),
+                         {"v": version, "d": description})
+        applied.append(version)
+        print(f"[FitAI] Applied migration {version}: {description}")
+    return applied
+
+
+if __name__ == "__main__":
+    from database.db import create_tables
+    print(f"Applied: {create_tables() or 'nothing, schema is up to date'}")
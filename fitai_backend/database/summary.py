@@ -0,0 +1,162 @@
+"""
+summary.py — Per-user workout totals maintained alongside workout_history
+Every insert of workouts applies its delta to user_workout_summary,
+user_exercise_summary and user_daily_rollup in the same transaction, so
+/workouts/stats reads one row instead of rescanning history and
+/workouts/timeseries reads one row per day. A delete recounts the affected
+user and day instead, and deleting a user drops their summary rows.
+
+Rebuild from workout_history (from fitai_backend/):
+    py -m database.summary
+"""
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+from sqlalchemy import select, delete, event, func, text
+from sqlalchemy.dialects import postgresql, sqlite
+from database.db import (engine, IS_SQLITE, User, UserWorkoutSummary, UserExerciseSummary,
+                         UserDailyRollup, WorkoutHistory)
+
+_insert = sqlite.insert if IS_SQLITE else postgresql.insert
+_least  = func.min if IS_SQLITE else func.least   # two-argument minimum
+
+SUMMARY_STATEMENTS = [
+    "DELETE FROM user_exercise_summary",
+    "DELETE FROM user_workout_summary",
+    "INSERT INTO user_workout_summary (user_id, sessions, total_calories, total_minutes) "
+    "SELECT user_id, COUNT(*), COALESCE(SUM(calories), 0), COALESCE(SUM(duration), 0) "
+    "FROM workout_history GROUP BY user_id",
+    "INSERT INTO user_exercise_summary (user_id, exercise, sessions, first_id) "
+    "SELECT user_id, exercise, COUNT(*), MIN(id) FROM workout_history GROUP BY user_id, exercise",
+]
+
+_DAY_SQL = "date(logged_at)" if IS_SQLITE else "CAST(logged_at AS DATE)"
+ROLLUP_STATEMENTS = [
+    "DELETE FROM user_daily_rollup",
+    "INSERT INTO user_daily_rollup (user_id, day, sessions, total_calories, total_minutes) "
+    f"SELECT user_id, {_DAY_SQL}, COUNT(*), COALESCE(SUM(calories), 0), COALESCE(SUM(duration), 0) "
+    f"FROM workout_history GROUP BY user_id, {_DAY_SQL}",
+]
+
+REBUILD_STATEMENTS = SUMMARY_STATEMENTS + ROLLUP_STATEMENTS
+
+
+# ── Incremental updates ────────────────────────────────────────────────────────
+async def add_workouts(db, user_id, workouts):
+    """Add flushed WorkoutHistory rows (or mappings with an id) to the user's totals."""
+    workouts = [_row(w) for w in workouts]
+    if not workouts:
+        return
+    stmt = _insert(UserWorkoutSummary).values(
+        user_id=user_id, sessions=len(workouts),
+        total_calories=sum(w["calories"] for w in workouts),
+        total_minutes=sum(w["duration"] for w in workouts))
+    await db.execute(stmt.on_conflict_do_update(
+        index_elements=["user_id"],
+        set_={"sessions":       UserWorkoutSummary.sessions + stmt.excluded.sessions,
+              "total_calories": UserWorkoutSummary.total_calories + stmt.excluded.total_calories,
+              "total_minutes":  UserWorkoutSummary.total_minutes + stmt.excluded.total_minutes}))
+
+    per_exercise = defaultdict(list)
+    for w in workouts:
+        per_exercise[w["exercise"]].append(w["id"])
+    stmt = _insert(UserExerciseSummary).values([
+        {"user_id": user_id, "exercise": exercise, "sessions": len(ids), "first_id": min(ids)}
+        for exercise, ids in per_exercise.items()])
+    await db.execute(stmt.on_conflict_do_update(
+        index_elements=["user_id", "exercise"],
+        set_={"sessions": UserExerciseSummary.sessions + stmt.excluded.sessions,
+              "first_id": _least(UserExerciseSummary.first_id, stmt.excluded.first_id)}))
+
+    per_day = defaultdict(lambda: [0, 0.0, 0])
+    for w in workouts:
+        totals = per_day[w["logged_at"].date()]
+        totals[0] += 1
+        totals[1] += w["calories"]
+        totals[2] += w["duration"]
+    stmt = _insert(UserDailyRollup).values([
+        {"user_id": user_id, "day": day, "sessions": n, "total_calories": cal, "total_minutes": mins}
+        for day, (n, cal, mins) in per_day.items()])
+    await db.execute(stmt.on_conflict_do_update(
+        index_elements=["user_id", "day"],
+        set_={"sessions":       UserDailyRollup.sessions + stmt.excluded.sessions,
+              "total_calories": UserDailyRollup.total_calories + stmt.excluded.total_calories,
+              "total_minutes":  UserDailyRollup.total_minutes + stmt.excluded.total_minutes}))
+
+async def _recount(db, *where):
+    """(sessions, total_calories, total_minutes) of the workout_history rows matching `where`."""
+    H = WorkoutHistory
+    return (await db.execute(select(func.count(), func.coalesce(func.sum(H.calories), 0.0),
+                                    func.coalesce(func.sum(H.duration), 0)).where(*where))).one()
+
+async def remove_workout(db, workout):
+    """Take a WorkoutHistory row that has been deleted (and flushed) out of its user's totals.
+
+    The user's totals and the workout's day are recounted from workout_history
+    rather than decremented, so float calorie totals cannot drift from the table.
+    """
+    w = _row(workout)
+    H, S, E, D = WorkoutHistory, UserWorkoutSummary, UserExerciseSummary, UserDailyRollup
+    sessions, calories, minutes = await _recount(db, H.user_id == w["user_id"])
+    await db.execute(S.__table__.update().where(S.user_id == w["user_id"]).values(
+        sessions=sessions, total_calories=calories, total_minutes=minutes))
+
+    key = (E.user_id == w["user_id"]) & (E.exercise == w["exercise"])
+    await db.execute(E.__table__.update().where(key).values(sessions=E.sessions - 1))
+    await db.execute(delete(E).where(key & (E.sessions <= 0)))
+    # Only when the oldest workout of this exercise went does the tie-breaker move
+    await db.execute(E.__table__.update().where(key & (E.first_id == w["id"])).values(
+        first_id=select(func.min(WorkoutHistory.id)).where(
+            WorkoutHistory.user_id == w["user_id"],
+            WorkoutHistory.exercise == w["exercise"]).scalar_subquery()))
+
+    day   = w["logged_at"].date()
+    start = datetime.combine(day, time.min)
+    sessions, calories, minutes = await _recount(
+        db, H.user_id == w["user_id"], H.logged_at >= start, H.logged_at < start + timedelta(days=1))
+    key = (D.user_id == w["user_id"]) & (D.day == day)
+    if sessions:
+        await db.execute(D.__table__.update().where(key).values(
+            sessions=sessions, total_calories=calories, total_minutes=minutes))
+    else:
+        await db.execute(delete(D).where(key))
+
+@event.listens_for(User, "before_delete")
+def _drop_user_summaries(mapper, connection, target):
+    """A deleted user's summary rows go with them (they reference users.id)."""
+    for table in (UserExerciseSummary, UserWorkoutSummary, UserDailyRollup):
+        connection.execute(delete(table).where(table.user_id == target.id))
+
+def _row(w):
+    if isinstance(w, dict):
+        return {**w, "calories": w.get("calories") or 0.0, "duration": w.get("duration") or 0}
+    return {"id": w.id, "user_id": w.user_id, "exercise": w.exercise, "logged_at": w.logged_at,
+            "calories": w.calories or 0.0, "duration": w.duration or 0}
+
+
+# ── Reads ──────────────────────────────────────────────────────────────────────
+async def get_summary(db, user_id):
+    """(sessions, total_calories, total_minutes, favourite_exercise) — None if nothing logged."""
+    S, E = UserWorkoutSummary, UserExerciseSummary
+    totals = (await db.execute(select(S.sessions, S.total_calories, S.total_minutes)
+                               .where(S.user_id == user_id))).first()
+    if totals is None or totals.sessions <= 0:
+        return None
+    favourite = await db.scalar(
+        select(E.exercise).where(E.user_id == user_id)
+        .order_by(E.sessions.desc(), E.first_id).limit(1))
+    return totals.sessions, totals.total_calories, totals.total_minutes, favourite
+
+
+# ── Rebuild ────────────────────────────────────────────────────────────────────
+def rebuild(bind=None):
+    """Recompute every summary row from workout_history in one transaction."""
+    with (bind or engine).begin() as conn:
+        for sql in REBUILD_STATEMENTS:
+            conn.execute(text(sql))
+        return conn.execute(text("SELECT COUNT(*) FROM user_workout_summary")).scalar()
+
+
+if __name__ == "__main__":
+    from database.db import create_tables
+    create_tables()
+    print(f"Rebuilt workout summaries for {rebuild()} users")
@@ -1,6 +1,7 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from database.db import create_tables
+from database.db import create_tables, async_engine
+from database.auth import shutdown_hash_pool
 from routers import auth, profile, ml, workouts
 
 # ── Create app ─────────────────────────────────────────────────────────────────
@@ -34,11 +35,19 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# ── Create database tables on startup ─────────────────────────────────────────
+# ── Create database tables and load ML models on startup ──────────────────────
 @app.on_event("startup")
 def startup():
     create_tables()
-    print("✅ FitAI Backend started — database ready")
+    from models import registry
+    registry.load_all()
+    print("✅ FitAI Backend started — database ready, ML models loaded")
+
+@app.on_event("shutdown")
+async def shutdown():
+    await ml.stop_batchers()
+    shutdown_hash_pool()
+    await async_engine.dispose()
 
 # ── Include routers ────────────────────────────────────────────────────────────
 app.include_router(auth.router)
@@ -1,6 +1,6 @@
-from pydantic import BaseModel
-from typing import Optional
-from datetime import datetime
+from pydantic import BaseModel, field_validator
+from typing import Optional, List
+from datetime import datetime, timezone
 
 # ── Auth Schemas ───────────────────────────────────────────────────────────────
 class RegisterRequest(BaseModel):
@@ -88,7 +88,25 @@ class CalorieResponse(BaseModel):
     calories_burned: float
     real_data:       bool
 
+class BatchPredictItem(BaseModel):
+    index:  int
+    result: Optional[dict] = None
+    error:  Optional[str] = None
+
+class BatchPredictResponse(BaseModel):
+    results:  List[BatchPredictItem]
+    n_ok:     int
+    n_errors: int
+
 # ── Workout History Schemas ────────────────────────────────────────────────────
+def to_naive_utc(dt):
+    """Naive UTC, the form DateTime columns store. The column drops an offset
+    without converting, which would misorder history cursors, put rows in the
+    wrong rollup day and shift range filters."""
+    if dt is not None and dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
+
 class WorkoutLogRequest(BaseModel):
     exercise: str
     duration: int
@@ -110,6 +128,24 @@ class WorkoutLogResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class WorkoutBulkRequest(WorkoutLogRequest):
+    logged_at: Optional[datetime] = None   # when the session happened; defaults to now
+
+    @field_validator("logged_at")
+    @classmethod
+    def _to_naive_utc(cls, v):
+        return to_naive_utc(v)
+
+class WorkoutBulkItem(BaseModel):
+    index: int
+    id:    Optional[int] = None
+    error: Optional[str] = None
+
+class WorkoutBulkResponse(BaseModel):
+    results:  List[WorkoutBulkItem]
+    n_ok:     int
+    n_errors: int
+
 # ── General ────────────────────────────────────────────────────────────────────
 class MessageResponse(BaseModel):
     message: str
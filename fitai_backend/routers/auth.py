@@ -1,17 +1,18 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from database.db import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from database.db import get_async_db
 from database import db as db_models
-from database.auth import hash_password, verify_password, create_access_token
+from database.auth import hash_password_async, verify_password_async, access_token_for
 from models.schemas import RegisterRequest, LoginRequest, TokenResponse, MessageResponse
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
 @router.post("/register", response_model=MessageResponse)
-def register(data: RegisterRequest, db: Session = Depends(get_db)):
+async def register(data: RegisterRequest, db: AsyncSession = Depends(get_async_db)):
     # Check if email already exists
-    existing = db.query(db_models.User).filter(
-        db_models.User.email == data.email).first()
+    existing = await db.scalar(select(db_models.User).where(
+        db_models.User.email == data.email))
     if existing:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -20,23 +21,22 @@ def register(data: RegisterRequest, db: Session = Depends(get_db)):
     user = db_models.User(
         name=data.name,
         email=data.email,
-        password_hash=hash_password(data.password)
+        password_hash=await hash_password_async(data.password)
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
     return {"message": f"User {data.name} registered successfully!"}
 
 @router.post("/login", response_model=TokenResponse)
-def login(data: LoginRequest, db: Session = Depends(get_db)):
-    user = db.query(db_models.User).filter(
-        db_models.User.email == data.email).first()
-    if not user or not verify_password(data.password, user.password_hash):
+async def login(data: LoginRequest, db: AsyncSession = Depends(get_async_db)):
+    user = await db.scalar(select(db_models.User).where(
+        db_models.User.email == data.email))
+    if not user or not await verify_password_async(data.password, user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password"
         )
-    token = create_access_token({"user_id": user.id, "email": user.email})
+    token = access_token_for(user)
     return {
         "access_token": token,
         "token_type":   "bearer",
@@ -45,5 +45,5 @@ def login(data: LoginRequest, db: Session = Depends(get_db)):
     }
 
 @router.get("/me")
-def get_me():
+async def get_me():
     return {"message": "Use token to access protected routes"}
@@ -1,27 +1,76 @@
-from fastapi import APIRouter, Depends, HTTPException
-from database.auth import get_current_user
-from database import db as db_models
+from fastapi import APIRouter, Depends, Header, HTTPException
+from pydantic import ValidationError
+from typing import List
+from database.auth import get_token_claims, Principal
 from models.schemas import (
     WorkoutPredictRequest, WorkoutPredictResponse,
     InjuryRiskRequest, InjuryRiskResponse,
-    CalorieRequest, CalorieResponse
+    CalorieRequest, CalorieResponse,
+    BatchPredictResponse
 )
+from services.batcher import MicroBatcher
+import hmac
 import sys, os
 sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "..", "fitness_ai_app_final"))
 
 router = APIRouter(prefix="/ml", tags=["ML Predictions"])
 
+MAX_BATCH_SIZE = 1000
+ML_ADMIN_TOKEN = os.getenv("ML_ADMIN_TOKEN", "")   # unset = admin routes disabled
+
+def require_admin(x_admin_token: str = Header("")):
+    """Operator-only routes: the X-Admin-Token header must equal ML_ADMIN_TOKEN."""
+    if not ML_ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not hmac.compare_digest(x_admin_token.encode(), ML_ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+def _validate_batch(items, schema):
+    """Validate each raw item separately so one bad row doesn't reject the batch."""
+    if len(items) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=413,
+                            detail=f"Batch too large — max {MAX_BATCH_SIZE} items")
+    valid, errors = [], []
+    for i, item in enumerate(items):
+        try:
+            valid.append((i, schema.model_validate(item)))
+        except ValidationError as e:
+            msg = "; ".join(f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}"
+                            for err in e.errors())
+            errors.append({"index": i, "result": None, "error": msg})
+    return valid, errors
+
+def _batch_response(valid, results, errors):
+    items = [{"index": i, "result": res, "error": None}
+             for (i, _), res in zip(valid, results)] + errors
+    items.sort(key=lambda x: x["index"])
+    return {"results": items, "n_ok": len(valid), "n_errors": len(errors)}
+
+# ── Micro-batching for the single-sample endpoints ─────────────────────────────
+def _workout_rows(rows):
+    from models.workout_model import predict_workout_levels
+    return predict_workout_levels(rows)
+
+def _calories_rows(rows):
+    from models.calories_model import predict_calories_batch
+    return predict_calories_batch(rows)
+
+workout_batcher  = MicroBatcher(_workout_rows)
+calories_batcher = MicroBatcher(_calories_rows)
+
+async def stop_batchers():
+    await workout_batcher.stop()
+    await calories_batcher.stop()
+
 @router.post("/workout-predict", response_model=WorkoutPredictResponse)
-def predict_workout(data: WorkoutPredictRequest,
-                    current_user: db_models.User = Depends(get_current_user)):
+async def predict_workout(data: WorkoutPredictRequest,
+                          current_user: Principal = Depends(get_token_claims)):
     try:
-        from models.workout_model import predict_workout_level, get_model_stats, WORKOUT_PLANS
-        level = predict_workout_level(
-            age=data.age, bmi=data.bmi,
-            experience_level=data.experience_level,
-            goal=data.goal, activity_level=data.activity_level,
+        from models.workout_model import get_model_stats, WORKOUT_PLANS
+        level = await workout_batcher.submit(dict(
+            age=data.age, experience_level=data.experience_level,
             weight=data.weight, height=data.height, gender=data.gender
-        )
+        ))
         stats = get_model_stats()
         plan  = WORKOUT_PLANS.get(level, {})
         return {
@@ -35,7 +84,7 @@ def predict_workout(data: WorkoutPredictRequest,
 
 @router.post("/injury-risk", response_model=InjuryRiskResponse)
 def predict_injury(data: InjuryRiskRequest,
-                   current_user: db_models.User = Depends(get_current_user)):
+                   current_user: Principal = Depends(get_token_claims)):
     try:
         from models.injury_model import predict_injury_risk
         risk, color, confidence = predict_injury_risk(
@@ -47,32 +96,101 @@ def predict_injury(data: InjuryRiskRequest,
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/calorie-predict", response_model=CalorieResponse)
-def predict_calories(data: CalorieRequest,
-                     current_user: db_models.User = Depends(get_current_user)):
+async def predict_calories(data: CalorieRequest,
+                           current_user: Principal = Depends(get_token_claims)):
     try:
-        from models.calories_model import predict_calories, get_calories_model_stats
-        cal   = predict_calories(
+        from models.calories_model import get_calories_model_stats
+        cal   = await calories_batcher.submit(dict(
             age=data.age, weight=data.weight, height=data.height,
             duration_mins=data.duration, heart_rate=data.heart_rate,
             gender=data.gender
-        )
+        ))
         stats = get_calories_model_stats()
         return {"calories_burned": cal, "real_data": stats.get("real_data", False)}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/workout-predict/batch", response_model=BatchPredictResponse)
+def predict_workout_batch(items: List[dict],
+                          current_user: Principal = Depends(get_token_claims)):
+    """Predict workout level for many members with a single model call."""
+    valid, errors = _validate_batch(items, WorkoutPredictRequest)
+    try:
+        from models.workout_model import predict_workout_levels, get_model_stats, WORKOUT_PLANS
+        levels = predict_workout_levels([
+            dict(age=d.age, experience_level=d.experience_level,
+                 weight=d.weight, height=d.height, gender=d.gender)
+            for _, d in valid])
+        stats = get_model_stats()
+        results = [{"level":     level,
+                    "accuracy":  stats.get("accuracy", 0),
+                    "real_data": stats.get("real_data", False),
+                    "plan":      WORKOUT_PLANS.get(level, {})} for level in levels]
+        return _batch_response(valid, results, errors)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/injury-risk/batch", response_model=BatchPredictResponse)
+def predict_injury_batch(items: List[dict],
+                         current_user: Principal = Depends(get_token_claims)):
+    """Predict injury risk for many samples with a single model call."""
+    valid, errors = _validate_batch(items, InjuryRiskRequest)
+    try:
+        from models.injury_model import predict_injury_risk_batch
+        preds = predict_injury_risk_batch([
+            dict(sleep=d.sleep, fatigue=d.fatigue,
+                 heart_rate=d.heart_rate, workout_freq=d.workout_freq)
+            for _, d in valid])
+        results = [{"risk": risk, "confidence": confidence, "color": color}
+                   for risk, color, confidence in preds]
+        return _batch_response(valid, results, errors)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/calorie-predict/batch", response_model=BatchPredictResponse)
+def predict_calories_batch(items: List[dict],
+                           current_user: Principal = Depends(get_token_claims)):
+    """Predict calories burned for many sessions with a single model call."""
+    valid, errors = _validate_batch(items, CalorieRequest)
+    try:
+        from models.calories_model import predict_calories_batch, get_calories_model_stats
+        cals = predict_calories_batch([
+            dict(age=d.age, weight=d.weight, height=d.height,
+                 duration_mins=d.duration, heart_rate=d.heart_rate, gender=d.gender)
+            for _, d in valid])
+        real = get_calories_model_stats().get("real_data", False)
+        results = [{"calories_burned": cal, "real_data": real} for cal in cals]
+        return _batch_response(valid, results, errors)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.get("/model-status")
-def model_status(current_user: db_models.User = Depends(get_current_user)):
+def model_status(current_user: Principal = Depends(get_token_claims)):
     """Returns status of all ML models."""
     try:
         from models.workout_model import get_model_stats
         from models.calories_model import get_calories_model_stats
+        from models import registry
         w_stats = get_model_stats()
         c_stats = get_calories_model_stats()
         return {
-            "workout_model":  {"accuracy": w_stats.get("accuracy"), "real_data": w_stats.get("real_data"), "samples": w_stats.get("n_samples")},
-            "calories_model": {"mae": c_stats.get("mae"), "r2": c_stats.get("r2"), "real_data": c_stats.get("real_data")},
+            "workout_model":  {"accuracy": w_stats.get("accuracy"), "real_data": w_stats.get("real_data"), "samples": w_stats.get("n_samples"), "version": w_stats.get("version")},
+            "calories_model": {"mae": c_stats.get("mae"), "r2": c_stats.get("r2"), "real_data": c_stats.get("real_data"), "version": c_stats.get("version")},
             "injury_model":   {"type": "Logistic Regression", "classes": ["Low", "Medium", "High"]},
+            "versions":       registry.versions(),
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/reload-models", dependencies=[Depends(require_admin)])
+def reload_models():
+    """Reload model artifacts from disk and swap them in atomically.
+
+    Admin only: a missing artifact is trained inline under the registry lock.
+    Reloads only the worker process that serves the request.
+    """
+    try:
+        from models import registry
+        return {"versions": registry.reload()}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -1,8 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from database.db import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from database.db import get_async_db
 from database import db as db_models
-from database.auth import get_current_user
+from database.auth import get_current_user, Principal
 from models.schemas import ProfileCreate, ProfileResponse
 from datetime import datetime
 import sys, os
@@ -34,17 +35,17 @@ ACTIVITY_MULTIPLIERS = {
 }
 
 @router.post("/save", response_model=ProfileResponse)
-def save_profile(data: ProfileCreate,
-                 current_user: db_models.User = Depends(get_current_user),
-                 db: Session = Depends(get_db)):
+async def save_profile(data: ProfileCreate,
+                       current_user: Principal = Depends(get_current_user),
+                       db: AsyncSession = Depends(get_async_db)):
     bmi      = calculate_bmi(data.weight, data.height)
     bmi_cat  = bmi_category(bmi)
     bmr      = calculate_bmr(data.weight, data.height, data.age, data.gender)
     mult     = ACTIVITY_MULTIPLIERS.get(data.activity_level, 1.55)
     tdee     = round(bmr * mult)
 
-    profile = db.query(db_models.UserProfile).filter(
-        db_models.UserProfile.user_id == current_user.id).first()
+    profile = await db.scalar(select(db_models.UserProfile).where(
+        db_models.UserProfile.user_id == current_user.id))
 
     if profile:
         # Update existing
@@ -73,15 +74,15 @@ def save_profile(data: ProfileCreate,
         )
         db.add(profile)
 
-    db.commit()
-    db.refresh(profile)
+    await db.commit()
+    await db.refresh(profile)
     return profile
 
 @router.get("/me", response_model=ProfileResponse)
-def get_profile(current_user: db_models.User = Depends(get_current_user),
-                db: Session = Depends(get_db)):
-    profile = db.query(db_models.UserProfile).filter(
-        db_models.UserProfile.user_id == current_user.id).first()
+async def get_profile(current_user: Principal = Depends(get_current_user),
+                      db: AsyncSession = Depends(get_async_db)):
+    profile = await db.scalar(select(db_models.UserProfile).where(
+        db_models.UserProfile.user_id == current_user.id))
     if not profile:
         raise HTTPException(status_code=404, detail="Profile not found. Please create one first.")
     return profile
@@ -1,17 +1,36 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
-from database.db import get_db
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy import select, insert, func, cast, Date, tuple_
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from datetime import datetime, date, timedelta
+import base64
+import csv
+import io
+import json
+import os
+from database.db import get_async_db, AsyncSessionLocal, IS_SQLITE
 from database import db as db_models
-from database.auth import get_current_user
-from models.schemas import WorkoutLogRequest, WorkoutLogResponse
+from database import summary
+from database.auth import get_current_user, Principal
+from models.schemas import (WorkoutLogRequest, WorkoutLogResponse,
+                            WorkoutBulkRequest, WorkoutBulkResponse, to_naive_utc)
 
 router = APIRouter(prefix="/workouts", tags=["Workout History"])
 
+BULK_MAX_ROWS   = int(os.getenv("WORKOUT_BULK_MAX_ROWS", "100000"))
+BULK_CHUNK_SIZE = int(os.getenv("WORKOUT_BULK_CHUNK_SIZE", "5000"))
+BULK_MAX_BYTES  = int(os.getenv("WORKOUT_BULK_MAX_BYTES", str(64 * 1024 * 1024)))
+EXPORT_YIELD_PER = 1000   # rows fetched from the cursor per chunk of /workouts/export
+TIMESERIES_SOURCE = os.getenv("TIMESERIES_SOURCE", "rollup")   # "rollup" or "history"
+TIMESERIES_MAX_BUCKETS = 1000
+
 @router.post("/log", response_model=WorkoutLogResponse)
-def log_workout(data: WorkoutLogRequest,
-                current_user: db_models.User = Depends(get_current_user),
-                db: Session = Depends(get_db)):
+async def log_workout(data: WorkoutLogRequest,
+                      current_user: Principal = Depends(get_current_user),
+                      db: AsyncSession = Depends(get_async_db)):
     """Log a completed workout session."""
     entry = db_models.WorkoutHistory(
         user_id=current_user.id,
@@ -21,61 +40,338 @@ def log_workout(data: WorkoutLogRequest,
         sets=data.sets,
         reps=data.reps,
         notes=data.notes,
+        logged_at=datetime.utcnow(),
     )
     db.add(entry)
-    db.commit()
-    db.refresh(entry)
+    await db.flush()
+    await summary.add_workouts(db, current_user.id, [entry])
+    await db.commit()
+    await db.refresh(entry)
     return entry
 
+# ── Bulk import ────────────────────────────────────────────────────────────────
+def _error_message(e):
+    return "; ".join(f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}"
+                     for err in e.errors())
+
+def _too_many_rows():
+    return HTTPException(status_code=413, detail=f"Too many workouts — max {BULK_MAX_ROWS} per request")
+
+def _too_large():
+    return HTTPException(status_code=413, detail=f"Body too large — max {BULK_MAX_BYTES} bytes")
+
+async def _body_chunks(request):
+    """The request body as it arrives; 413 once it is known to exceed BULK_MAX_BYTES."""
+    length = request.headers.get("content-length", "")
+    if length.isdigit() and int(length) > BULK_MAX_BYTES:
+        raise _too_large()
+    size = 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > BULK_MAX_BYTES:
+            raise _too_large()
+        yield chunk
+
+async def _ndjson_lines(request):
+    """Non-empty body lines, yielded as soon as each one is complete."""
+    pending = b""
+    async for chunk in _body_chunks(request):
+        *lines, pending = (pending + chunk).split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield line
+    if pending.strip():
+        yield pending
+
+async def _parse_bulk_body(request):
+    """Raw items from a JSON array or, for application/x-ndjson, one JSON object per line.
+
+    NDJSON is decoded line by line while the body streams in and stops at
+    BULK_MAX_ROWS; a JSON array has to be read whole before it can be parsed.
+    """
+    if "ndjson" in request.headers.get("content-type", ""):
+        items = []
+        async for line in _ndjson_lines(request):
+            if len(items) == BULK_MAX_ROWS:
+                raise _too_many_rows()
+            try:
+                items.append(json.loads(line))
+            except ValueError as e:
+                items.append(e)   # reported against this row
+        return items
+    body = b"".join([chunk async for chunk in _body_chunks(request)])
+    try:
+        items = json.loads(body)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Body must be a JSON array or NDJSON")
+    if not isinstance(items, list):
+        raise HTTPException(status_code=400, detail="Body must be a JSON array or NDJSON")
+    if len(items) > BULK_MAX_ROWS:
+        raise _too_many_rows()
+    return items
+
+@router.post("/bulk", response_model=WorkoutBulkResponse)
+async def bulk_log_workouts(request: Request,
+                            current_user: Principal = Depends(get_current_user),
+                            db: AsyncSession = Depends(get_async_db)):
+    """Log many workout sessions at once, e.g. a wearable sync.
+
+    Accepts a JSON array or NDJSON (Content-Type: application/x-ndjson) of
+    workouts with an optional `logged_at`. Every row is validated; the valid
+    ones are inserted in chunked transactions and each row gets its own status.
+    """
+    items = await _parse_bulk_body(request)
+
+    results, valid = [], []
+    now = datetime.utcnow()
+    for i, item in enumerate(items):
+        try:
+            if isinstance(item, ValueError):
+                raise item
+            d = WorkoutBulkRequest.model_validate(item)
+        except ValidationError as e:
+            results.append({"index": i, "id": None, "error": _error_message(e)})
+            continue
+        except ValueError as e:
+            results.append({"index": i, "id": None, "error": f"invalid JSON: {e}"})
+            continue
+        valid.append((i, {"user_id": current_user.id, "exercise": d.exercise,
+                          "duration": d.duration, "calories": d.calories, "sets": d.sets,
+                          "reps": d.reps, "notes": d.notes, "logged_at": d.logged_at or now}))
+
+    table = db_models.WorkoutHistory.__table__
+    # Multi-row INSERT ... RETURNING. SQLite hands rowids out in ascending row
+    # order, so sorting them lines them up with the rows without
+    # sort_by_parameter_order (which makes SQLite fall back to one INSERT per
+    # row). Other databases give no such guarantee and return them in order.
+    stmt  = insert(table).returning(table.c.id, sort_by_parameter_order=not IS_SQLITE)
+    n_ok  = 0
+    for start in range(0, len(valid), BULK_CHUNK_SIZE):
+        chunk = valid[start:start + BULK_CHUNK_SIZE]
+        rows  = [row for _, row in chunk]
+        try:
+            ids = (await db.execute(stmt, rows)).scalars().all()
+            if IS_SQLITE:
+                ids = sorted(ids)
+            await summary.add_workouts(db, current_user.id,
+                                       [{**row, "id": id_} for row, id_ in zip(rows, ids)])
+            await db.commit()
+        except SQLAlchemyError as e:
+            await db.rollback()
+            results.extend({"index": i, "id": None, "error": f"not saved: {type(e).__name__}"}
+                           for i, _ in chunk)
+            continue
+        results.extend({"index": i, "id": id_, "error": None} for (i, _), id_ in zip(chunk, ids))
+        n_ok += len(chunk)
+
+    results.sort(key=lambda x: x["index"])
+    return {"results": results, "n_ok": n_ok, "n_errors": len(results) - n_ok}
+
+# ── Export ─────────────────────────────────────────────────────────────────────
+EXPORT_COLUMNS = ["id", "exercise", "duration", "calories", "sets", "reps", "notes", "logged_at"]
+
+async def _export_rows(user_id, start, end):
+    """Yield the user's workouts oldest first, EXPORT_YIELD_PER rows at a time.
+
+    Opens its own session: the request's session is closed before the
+    streaming body is sent.
+    """
+    table = db_models.WorkoutHistory.__table__
+    query = select(*(table.c[name] for name in EXPORT_COLUMNS)).where(table.c.user_id == user_id)
+    if start is not None:
+        query = query.where(table.c.logged_at >= start)
+    if end is not None:
+        query = query.where(table.c.logged_at < end)
+    query = query.order_by(table.c.logged_at, table.c.id).execution_options(yield_per=EXPORT_YIELD_PER)
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(query)
+        async for rows in result.partitions():
+            yield rows
+
+async def _export_ndjson(chunks):
+    dumps = json.JSONEncoder(default=datetime.isoformat).encode
+    async for rows in chunks:
+        yield "".join([dumps(dict(zip(EXPORT_COLUMNS, row))) + "\n" for row in rows])
+
+async def _export_csv(chunks):
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(EXPORT_COLUMNS)
+    async for rows in chunks:
+        writer.writerows(rows)
+        yield buf.getvalue()
+        buf.seek(0)
+        buf.truncate()
+    if buf.tell():   # header only — no workouts in range
+        yield buf.getvalue()
+
+@router.get("/export")
+async def export_workouts(fmt: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+                          start: Optional[datetime] = None,
+                          end: Optional[datetime] = None,
+                          current_user: Principal = Depends(get_current_user)):
+    """Stream the current user's full workout history as NDJSON or CSV.
+
+    Optional `start` (inclusive) and `end` (exclusive) limit the date range;
+    values with an offset are converted to UTC, naive ones are taken as UTC.
+    Rows come off a server-side cursor in chunks, so memory stays flat
+    whatever the size of the history.
+    """
+    chunks = _export_rows(current_user.id, to_naive_utc(start), to_naive_utc(end))
+    if fmt == "csv":
+        body, media_type = _export_csv(chunks), "text/csv"
+    else:
+        body, media_type = _export_ndjson(chunks), "application/x-ndjson"
+    return StreamingResponse(body, media_type=media_type, headers={
+        "Content-Disposition": f'attachment; filename="workouts.{fmt}"'})
+
+# ── History cursors ────────────────────────────────────────────────────────────
+# Opaque token for the last row of a page: urlsafe base64 of "<logged_at>|<id>".
+def encode_cursor(entry):
+    raw = f"{entry.logged_at.isoformat()}|{entry.id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        logged_at, entry_id = raw.split("|")
+        return datetime.fromisoformat(logged_at), int(entry_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid history cursor")
+
 @router.get("/history", response_model=List[WorkoutLogResponse])
-def get_history(limit: int = 20,
-                current_user: db_models.User = Depends(get_current_user),
-                db: Session = Depends(get_db)):
-    """Get workout history for current user."""
-    workouts = db.query(db_models.WorkoutHistory).filter(
-        db_models.WorkoutHistory.user_id == current_user.id
-    ).order_by(db_models.WorkoutHistory.logged_at.desc()).limit(limit).all()
+async def get_history(response: Response,
+                      limit: int = Query(20, ge=1, le=500),
+                      before: Optional[str] = None,
+                      current_user: Principal = Depends(get_current_user),
+                      db: AsyncSession = Depends(get_async_db)):
+    """Get workout history for current user, newest first.
+
+    Pass the X-Next-Cursor header of one page as `before` to fetch the next;
+    each page is a single range scan of ix_workout_history_user_logged.
+    """
+    W = db_models.WorkoutHistory
+    query = select(W).where(W.user_id == current_user.id)
+    if before:
+        logged_at, entry_id = decode_cursor(before)
+        query = query.where(tuple_(W.logged_at, W.id) < (logged_at, entry_id))
+    workouts = (await db.scalars(
+        query.order_by(W.logged_at.desc(), W.id.desc()).limit(limit))).all()
+    if len(workouts) == limit:
+        response.headers["X-Next-Cursor"] = encode_cursor(workouts[-1])
     return workouts
 
 @router.get("/stats")
-def get_stats(current_user: db_models.User = Depends(get_current_user),
-              db: Session = Depends(get_db)):
-    """Get summary stats for current user's workouts."""
-    workouts = db.query(db_models.WorkoutHistory).filter(
-        db_models.WorkoutHistory.user_id == current_user.id
-    ).all()
-
-    if not workouts:
+async def get_stats(current_user: Principal = Depends(get_current_user),
+                    db: AsyncSession = Depends(get_async_db)):
+    """Get summary stats for current user's workouts (one read of user_workout_summary)."""
+    totals = await summary.get_summary(db, current_user.id)
+    if totals is None:
         return {"total_sessions": 0, "total_calories": 0,
                 "total_minutes": 0, "favourite_exercise": "None"}
 
-    total_cal  = round(sum(w.calories for w in workouts), 1)
-    total_mins = sum(w.duration for w in workouts)
-
-    # Find favourite exercise
-    from collections import Counter
-    fav = Counter(w.exercise for w in workouts).most_common(1)[0][0]
-
+    sessions, calories, minutes, fav = totals
+    total_cal = round(calories, 1)
     return {
-        "total_sessions":    len(workouts),
+        "total_sessions":    sessions,
         "total_calories":    total_cal,
-        "total_minutes":     total_mins,
+        "total_minutes":     minutes,
         "favourite_exercise": fav,
-        "avg_calories_per_session": round(total_cal / len(workouts), 1),
-        "avg_duration":      round(total_mins / len(workouts), 1),
+        "avg_calories_per_session": round(total_cal / sessions, 1),
+        "avg_duration":      round(minutes / sessions, 1),
     }
 
+# ── Time series ────────────────────────────────────────────────────────────────
+DEFAULT_PERIODS = {"day": 7, "week": 12, "month": 12}
+
+def _bucket_start(d, bucket):
+    if bucket == "week":
+        return d - timedelta(days=d.weekday())   # weeks start on Monday
+    if bucket == "month":
+        return d.replace(day=1)
+    return d
+
+def _next_bucket(d, bucket):
+    if bucket == "week":
+        return d + timedelta(days=7)
+    if bucket == "month":
+        return (d.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return d + timedelta(days=1)
+
+def _bucket_sql(col, bucket):
+    """SQL expression mapping a date/datetime column to the first day of its bucket."""
+    if not IS_SQLITE:
+        return cast(func.date_trunc(bucket, col), Date)
+    if bucket == "week":
+        return func.date(col, "weekday 0", "-6 days")
+    if bucket == "month":
+        return func.strftime("%Y-%m-01", col)
+    return func.date(col)
+
+@router.get("/timeseries")
+async def get_timeseries(bucket: str = Query("day", pattern="^(day|week|month)$"),
+                         start: Optional[date] = None,
+                         end: Optional[date] = None,
+                         current_user: Principal = Depends(get_current_user),
+                         db: AsyncSession = Depends(get_async_db)):
+    """Sessions, calories and minutes per day, week (Mon–Sun) or month, in UTC.
+
+    Covers the buckets containing `start` through `end` (default: the last
+    7 days / 12 weeks / 12 months including the current one); empty buckets
+    are zero.
+    """
+    last  = _bucket_start(end or datetime.utcnow().date(), bucket)
+    first = _bucket_start(start, bucket) if start else last
+    if not start:
+        for _ in range(DEFAULT_PERIODS[bucket] - 1):
+            first = _bucket_start(first - timedelta(days=1), bucket)
+    if first > last:
+        raise HTTPException(status_code=400, detail="start must not be after end")
+    periods = [first]
+    while periods[-1] < last:
+        periods.append(_next_bucket(periods[-1], bucket))
+        if len(periods) > TIMESERIES_MAX_BUCKETS:
+            raise HTTPException(status_code=400,
+                                detail=f"Range too long — max {TIMESERIES_MAX_BUCKETS} buckets")
+    stop = _next_bucket(last, bucket)
+
+    if TIMESERIES_SOURCE == "rollup":
+        R = db_models.UserDailyRollup
+        period = _bucket_sql(R.day, bucket)
+        query = (select(period, func.sum(R.sessions), func.sum(R.total_calories),
+                        func.sum(R.total_minutes))
+                 .where(R.user_id == current_user.id, R.day >= first, R.day < stop))
+    else:
+        W = db_models.WorkoutHistory
+        period = _bucket_sql(W.logged_at, bucket)
+        query = (select(period, func.count(), func.sum(W.calories), func.sum(W.duration))
+                 .where(W.user_id == current_user.id,
+                        W.logged_at >= datetime.combine(first, datetime.min.time()),
+                        W.logged_at < datetime.combine(stop, datetime.min.time())))
+    rows = (await db.execute(query.group_by(period))).all()
+    totals = {str(p): (n, cal or 0.0, mins or 0) for p, n, cal, mins in rows}
+
+    points = []
+    for p in periods:
+        n, cal, mins = totals.get(p.isoformat(), (0, 0.0, 0))
+        points.append({"period": p.isoformat(), "sessions": n,
+                       "calories": round(cal, 1), "minutes": mins})
+    return {"bucket": bucket, "start": first.isoformat(), "end": last.isoformat(),
+            "points": points}
+
 @router.delete("/delete/{workout_id}")
-def delete_workout(workout_id: int,
-                   current_user: db_models.User = Depends(get_current_user),
-                   db: Session = Depends(get_db)):
+async def delete_workout(workout_id: int,
+                         current_user: Principal = Depends(get_current_user),
+                         db: AsyncSession = Depends(get_async_db)):
     """Delete a specific workout log entry."""
-    entry = db.query(db_models.WorkoutHistory).filter(
+    entry = await db.scalar(select(db_models.WorkoutHistory).where(
         db_models.WorkoutHistory.id == workout_id,
         db_models.WorkoutHistory.user_id == current_user.id
-    ).first()
+    ))
     if not entry:
         raise HTTPException(status_code=404, detail="Workout not found")
-    db.delete(entry)
-    db.commit()
+    await db.delete(entry)
+    await db.flush()
+    await summary.remove_workout(db, entry)
+    await db.commit()
     return {"message": f"Workout {workout_id} deleted successfully"}
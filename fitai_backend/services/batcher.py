@@ -0,0 +1,85 @@
+"""
+batcher.py — Micro-batching scheduler for single-sample ML requests
+Concurrent requests are collected for a few milliseconds and scored with
+one vectorised model call, then each awaiting handler gets its own result.
+"""
+import asyncio
+import os
+
+MAX_BATCH_SIZE = int(os.getenv("ML_BATCH_MAX_SIZE", "64"))
+MAX_WAIT_MS    = float(os.getenv("ML_BATCH_MAX_WAIT_MS", "5"))
+
+
+class MicroBatcher:
+    def __init__(self, predict_fn, max_batch_size=MAX_BATCH_SIZE, max_wait_ms=MAX_WAIT_MS):
+        # predict_fn: list of rows -> list of results, same order
+        self.predict_fn     = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait       = max_wait_ms / 1000
+        self._queue = None
+        self._task  = None
+
+    async def submit(self, row):
+        """Queue one row and wait for its result."""
+        if self._task is None or self._task.done():
+            self._queue = asyncio.Queue()
+            self._task  = asyncio.get_running_loop().create_task(self._run())
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((row, future))
+        return await future
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _collect(self):
+        loop  = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    def _predict(self, rows):
+        try:
+            return [(True, r) for r in self.predict_fn(rows)]
+        except Exception:
+            if len(rows) == 1:
+                raise
+        # One bad row shouldn't fail its neighbours — retry row by row
+        results = []
+        for row in rows:
+            try:
+                results.append((True, self.predict_fn([row])[0]))
+            except Exception as e:
+                results.append((False, e))
+        return results
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            rows  = [row for row, _ in batch]
+            try:
+                # Run the model off the event loop so the next batch keeps filling
+                results = await loop.run_in_executor(None, self._predict, rows)
+            except Exception as e:
+                results = [(False, e)] * len(batch)
+            for (_, future), (ok, value) in zip(batch, results):
+                if future.done():
+                    continue
+                if ok:
+                    future.set_result(value)
+                else:
+                    future.set_exception(value)
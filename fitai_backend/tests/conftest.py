@@ -0,0 +1,34 @@
+import os
+import sys
+import tempfile
+import uuid
+import pytest
+
+# Tests import the backend's packages (database, routers, ...) the way main.py does,
+# against a throwaway SQLite file — DATABASE_URL must be set before database.db loads
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "test.db")
+
+
+@pytest.fixture(scope="session")
+def client():
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from database import db
+    from routers import workouts
+    db.create_tables()
+    app = FastAPI()
+    app.include_router(workouts.router)
+    with TestClient(app) as c:
+        yield c
+
+@pytest.fixture
+def user(client):
+    """(user id, auth headers) of a fresh user."""
+    from database import db
+    from database.auth import access_token_for
+    with db.SessionLocal() as s:
+        u = db.User(name="test", email=f"{uuid.uuid4().hex}@test.local", password_hash="x")
+        s.add(u)
+        s.commit()
+        return u.id, {"Authorization": f"Bearer {access_token_for(u)}"}
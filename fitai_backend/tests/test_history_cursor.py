@@ -0,0 +1,53 @@
+"""
+Keyset pagination of /workouts/history: following X-Next-Cursor must visit
+every workout exactly once, newest first, even when many share a logged_at
+(as rows imported through /workouts/bulk routinely do).
+"""
+from datetime import datetime, timedelta
+
+
+def bulk(client, user, timestamps):
+    rows = [{"exercise": "Running", "duration": 30, "calories": 100.0, "sets": 3, "reps": 10,
+             "logged_at": t.isoformat()} for t in timestamps]
+    r = client.post("/workouts/bulk", headers=user[1], json=rows)
+    assert r.json()["n_ok"] == len(rows)
+    return [x["id"] for x in r.json()["results"]]
+
+def all_pages(client, user, limit):
+    pages, cursor = [], None
+    while True:
+        params = {"limit": limit, **({"before": cursor} if cursor else {})}
+        r = client.get("/workouts/history", headers=user[1], params=params)
+        assert r.status_code == 200, r.text
+        pages.append(r.json())
+        cursor = r.headers.get("X-Next-Cursor")
+        if cursor is None:
+            return pages
+
+
+def test_pages_cover_equal_timestamps_exactly_once(client, user):
+    t = datetime(2026, 3, 1, 12, 0)
+    # 3 timestamps x 10 rows each, plus a few distinct ones, inserted out of order
+    stamps = [t] * 10 + [t + timedelta(hours=1)] * 10 + [t - timedelta(hours=1)] * 10 \
+             + [t + timedelta(minutes=m) for m in (5, 50, 70)]
+    ids = bulk(client, user, stamps)
+    expected = [i for _, i in sorted(zip(stamps, ids), reverse=True)]   # (logged_at, id) DESC
+
+    for limit in (1, 4, 7, 10, 33, 50):
+        pages = all_pages(client, user, limit)
+        seen = [w["id"] for page in pages for w in page]
+        assert seen == expected, f"limit={limit}"
+        assert all(len(page) == limit for page in pages[:-1])
+
+def test_page_boundary_inside_a_run_of_equal_timestamps(client, user):
+    ids = bulk(client, user, [datetime(2026, 3, 2, 8, 0)] * 5)
+    first = client.get("/workouts/history", headers=user[1], params={"limit": 2})
+    rest = client.get("/workouts/history", headers=user[1],
+                      params={"limit": 10, "before": first.headers["X-Next-Cursor"]})
+    assert [w["id"] for w in first.json()] == ids[::-1][:2]
+    assert [w["id"] for w in rest.json()] == ids[::-1][2:]
+    assert "X-Next-Cursor" not in rest.headers
+
+def test_invalid_cursor_is_rejected(client, user):
+    r = client.get("/workouts/history", headers=user[1], params={"before": "not-a-cursor"})
+    assert r.status_code == 400
@@ -0,0 +1,104 @@
+"""
+The summary tables (user_workout_summary, user_exercise_summary,
+user_daily_rollup) must always equal a fresh rebuild() from workout_history,
+whatever mix of /workouts/log, /workouts/bulk, /workouts/delete and user
+deletion produced them.
+"""
+import random
+from datetime import datetime, timedelta
+from sqlalchemy import select
+from database import db, summary
+
+S, E, D = db.UserWorkoutSummary, db.UserExerciseSummary, db.UserDailyRollup
+
+
+def summary_rows(user_id):
+    """The user's summary rows, with a zero-session total treated as no row (as get_summary does)."""
+    with db.SessionLocal() as s:
+        total = s.execute(select(S.sessions, S.total_calories, S.total_minutes)
+                          .where(S.user_id == user_id)).first()
+        if total is not None and total.sessions == 0:
+            total = None
+        if total is not None:
+            total = (total.sessions, round(total.total_calories, 6), total.total_minutes)
+        exercises = sorted(tuple(r) for r in s.execute(
+            select(E.exercise, E.sessions, E.first_id).where(E.user_id == user_id)))
+        days = sorted((r.day, r.sessions, round(r.total_calories, 6), r.total_minutes) for r in s.execute(
+            select(D.day, D.sessions, D.total_calories, D.total_minutes).where(D.user_id == user_id)))
+    return total, exercises, days
+
+def assert_matches_rebuild(client, user):
+    user_id, headers = user
+    before = summary_rows(user_id)
+    stats  = client.get("/workouts/stats", headers=headers).json()
+    summary.rebuild()
+    assert summary_rows(user_id) == before
+    assert client.get("/workouts/stats", headers=headers).json() == stats
+    return stats
+
+def log(client, user, exercise, calories=100.0, duration=30):
+    r = client.post("/workouts/log", headers=user[1], json={
+        "exercise": exercise, "duration": duration, "calories": calories, "sets": 3, "reps": 10})
+    assert r.status_code == 200, r.text
+    return r.json()["id"]
+
+def delete(client, user, workout_id):
+    assert client.delete(f"/workouts/delete/{workout_id}", headers=user[1]).status_code == 200
+
+
+def test_mixed_log_bulk_delete_matches_rebuild(client, user):
+    rng = random.Random(7)
+    exercises = ["Running", "Squats", "Cycling", "Yoga"]
+    ids = [log(client, user, rng.choice(exercises), round(rng.uniform(10, 900), 1), rng.randint(5, 90))
+           for _ in range(20)]
+
+    base = datetime(2026, 3, 1, 22, 30)
+    rows = [{"exercise": rng.choice(exercises), "duration": rng.randint(5, 90),
+             "calories": round(rng.uniform(10, 900), 1), "sets": 3, "reps": 10,
+             # several rows per timestamp, some with an offset that moves them to another UTC day
+             "logged_at": (base + timedelta(hours=rng.randrange(0, 96, 6))).isoformat()
+                          + rng.choice(["", "Z", "-05:00", "+09:00"])}
+            for _ in range(60)]
+    r = client.post("/workouts/bulk", headers=user[1], json=rows)
+    assert r.json()["n_ok"] == 60
+    ids += [x["id"] for x in r.json()["results"]]
+    assert_matches_rebuild(client, user)
+
+    for workout_id in rng.sample(ids, 45):
+        delete(client, user, workout_id)
+    stats = assert_matches_rebuild(client, user)
+    assert stats["total_sessions"] == 35
+
+def test_favourite_ties_go_to_the_oldest_exercise(client, user):
+    first_squat = log(client, user, "Squats")
+    log(client, user, "Running")
+    running = log(client, user, "Running")
+    log(client, user, "Squats")
+    assert assert_matches_rebuild(client, user)["favourite_exercise"] == "Squats"   # 2-2, squats first
+
+    delete(client, user, first_squat)
+    assert assert_matches_rebuild(client, user)["favourite_exercise"] == "Running"  # 2-1
+
+    delete(client, user, running)
+    assert assert_matches_rebuild(client, user)["favourite_exercise"] == "Running"  # 1-1, running now oldest
+
+def test_deleting_down_to_zero(client, user):
+    ids = [log(client, user, "Running", calories) for calories in (0.1, 0.2, 0.3, 1e6 + 0.7)]
+    for workout_id in ids:
+        delete(client, user, workout_id)
+    stats = assert_matches_rebuild(client, user)
+    assert stats["total_sessions"] == 0
+    assert summary_rows(user[0]) == (None, [], [])
+
+def test_deleting_a_user_drops_their_summaries(client, user):
+    user_id, _ = user
+    for exercise in ("Running", "Yoga"):
+        log(client, user, exercise)
+    with db.SessionLocal() as s:
+        s.delete(s.get(db.User, user_id))
+        s.commit()
+    assert summary_rows(user_id) == (None, [], [])
+    with db.SessionLocal() as s:   # workouts go with the user instead of losing their user_id
+        assert s.scalar(select(db.WorkoutHistory.id).where(db.WorkoutHistory.user_id.is_(None))) is None
+    summary.rebuild()
+    assert summary_rows(user_id) == (None, [], [])
@@ -2,29 +2,207 @@
 api_client.py — Streamlit frontend API client
 Handles all HTTP requests to the FastAPI backend
 """
+import os
+import threading
+import time
+from collections import deque
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import streamlit as st
 
 BASE_URL = "https://fitai-backend-69an.onrender.com"
-```
 
-def get_headers():
-    token = st.session_state.get("token", "")
+CONNECT_TIMEOUT = float(os.getenv("FITAI_API_CONNECT_TIMEOUT", "5"))    # seconds
+READ_TIMEOUT    = float(os.getenv("FITAI_API_READ_TIMEOUT", "30"))      # seconds
+POOL_SIZE       = int(os.getenv("FITAI_API_POOL_SIZE", "16"))
+MAX_RETRIES     = int(os.getenv("FITAI_API_RETRIES", "3"))
+TIMEOUT         = (CONNECT_TIMEOUT, READ_TIMEOUT)
+
+HEALTH_TTL          = float(os.getenv("FITAI_HEALTH_TTL", "30"))        # seconds between probes while up
+HEALTH_FAILURES     = int(os.getenv("FITAI_HEALTH_FAILURES", "3"))      # consecutive failures to open
+HEALTH_RETRY_MIN    = float(os.getenv("FITAI_HEALTH_RETRY_MIN", "5"))   # first half-open probe delay
+HEALTH_RETRY_MAX    = 60.0                                              # backoff cap while down
+
+# ── Shared HTTP session ────────────────────────────────────────────────────────
+# One keep-alive connection pool for the whole Streamlit process, so reruns reuse
+# TCP/TLS connections instead of opening a new one per call. Connection failures
+# are retried for every method (nothing was sent); read errors and 502/503/504
+# only for GET/HEAD. A write is never re-sent: a DELETE retried after a read
+# timeout would get a 404 for the row it already deleted.
+def _make_session():
+    retry = Retry(
+        total=MAX_RETRIES,
+        connect=MAX_RETRIES,
+        read=MAX_RETRIES,
+        status=MAX_RETRIES,
+        backoff_factor=0.3,                     # 0.3s, 0.6s, 1.2s ...
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=2, pool_maxsize=POOL_SIZE, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+_session = _make_session()
+
+# ── Latency metrics ────────────────────────────────────────────────────────────
+_metrics      = {}   # "METHOD /route" -> {"count", "errors", "total", "max", "recent"}
+_metrics_lock = threading.Lock()
+
+def _record(endpoint, elapsed, ok):
+    with _metrics_lock:
+        m = _metrics.setdefault(endpoint, {"count": 0, "errors": 0, "total": 0.0,
+                                           "max": 0.0, "recent": deque(maxlen=200)})
+        m["count"] += 1
+        m["errors"] += 0 if ok else 1
+        m["total"] += elapsed
+        m["max"] = max(m["max"], elapsed)
+        m["recent"].append(elapsed)
+
+def get_latency_metrics():
+    """Per-endpoint call count, error count and latency (ms) since the process started."""
+    out = {}
+    with _metrics_lock:
+        for endpoint, m in _metrics.items():
+            recent = sorted(m["recent"])
+            out[endpoint] = {
+                "count":  m["count"],
+                "errors": m["errors"],
+                "avg_ms": round(m["total"] / m["count"] * 1000, 1),
+                "p50_ms": round(recent[len(recent) // 2] * 1000, 1),
+                "p95_ms": round(recent[int(len(recent) * 0.95)] * 1000, 1),
+                "max_ms": round(m["max"] * 1000, 1),
+            }
+    return out
+
+# ── Backend health (circuit breaker) ───────────────────────────────────────────
+class BackendUnavailable(requests.ConnectionError):
+    """Raised without touching the network while the breaker is open."""
+
+class HealthProbe:
+    """Cached backend health with a background refresher.
+
+    closed    — backend up; /health re-probed every HEALTH_TTL seconds.
+    open      — HEALTH_FAILURES consecutive failures; calls fail immediately.
+    half-open — after a backoff delay one probe is let through; success
+                closes the breaker, failure re-opens it with a longer delay.
+    Real API calls feed the same counters, so an outage is noticed on the
+    first failing page rather than at the next probe.
+    """
+
+    def __init__(self):
+        self.state      = "closed"
+        self.failures   = 0
+        self.last_ok    = None
+        self.last_check = None
+        self.retry_in   = HEALTH_RETRY_MIN
+        self._next_probe = 0.0
+        self._lock   = threading.Lock()
+        self._wake   = threading.Event()
+        self._thread = None
+
+    # Called from request paths
+    def allow(self):
+        self._ensure_refresher()
+        with self._lock:
+            return self.state == "closed"
+
+    def record(self, ok):
+        with self._lock:
+            self.last_check = time.time()
+            if ok:
+                self.state, self.failures, self.last_ok = "closed", 0, self.last_check
+                self.retry_in = HEALTH_RETRY_MIN
+                self._next_probe = time.monotonic() + HEALTH_TTL
+                return
+            self.failures += 1
+            if self.state == "half-open" or self.failures >= HEALTH_FAILURES:
+                if self.state == "half-open":
+                    self.retry_in = min(self.retry_in * 2, HEALTH_RETRY_MAX)
+                self.state = "open"
+                self._next_probe = time.monotonic() + self.retry_in
+        self._wake.set()
+
+    def status(self):
+        with self._lock:
+            return {"state": self.state, "failures": self.failures,
+                    "last_ok": self.last_ok, "last_check": self.last_check}
+
+    # Background refresher
+    def _ensure_refresher(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="fitai-health",
+                                                    daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._lock:
+                delay = self._next_probe - time.monotonic()
+            if delay > 0:
+                self._wake.wait(delay)
+                self._wake.clear()
+                continue
+            with self._lock:
+                if self.state == "open":
+                    self.state = "half-open"
+            self.record(_probe())
+
+def _probe():
+    start = time.perf_counter()
+    ok = False
+    try:
+        ok = _session.get(f"{BASE_URL}/health", timeout=TIMEOUT).status_code == 200
+    except requests.RequestException:
+        pass
+    _record("GET /health", time.perf_counter() - start, ok)
+    return ok
+
+health = HealthProbe()
+
+def _request(method, route, path=None, timeout=TIMEOUT, **kwargs):
+    """Send a request through the shared session, timing it under `METHOD route`.
+
+    Fails fast with BackendUnavailable while the health breaker is open.
+    """
+    if not health.allow():
+        raise BackendUnavailable(f"Backend unavailable ({health.state})")
+    start = time.perf_counter()
+    ok = False
+    try:
+        r = _session.request(method, f"{BASE_URL}{path or route}", timeout=timeout, **kwargs)
+        ok = r.status_code < 500
+        return r
+    finally:
+        health.record(ok)
+        _record(f"{method} {route}", time.perf_counter() - start, ok)
+
+def get_headers(token=None):
+    # Worker threads have no session_state, so callers there pass the token explicitly
+    if token is None:
+        token = st.session_state.get("token", "")
     return {"Authorization": f"Bearer {token}"}
 
 # ── Auth ───────────────────────────────────────────────────────────────────────
 def register(name, email, password):
     try:
-        r = requests.post(f"{BASE_URL}/auth/register",
-                          json={"name": name, "email": email, "password": password})
+        r = _request("POST", "/auth/register",
+                     json={"name": name, "email": email, "password": password})
         return r.json(), r.status_code == 200
     except Exception:
         return {"message": "❌ Backend not running. Start it first."}, False
 
 def login(email, password):
     try:
-        r = requests.post(f"{BASE_URL}/auth/login",
-                          json={"email": email, "password": password})
+        r = _request("POST", "/auth/login",
+                     json={"email": email, "password": password})
         return r.json(), r.status_code == 200
     except Exception:
         return {"message": "❌ Backend not running. Start it first."}, False
@@ -32,15 +210,15 @@ def login(email, password):
 # ── Profile ────────────────────────────────────────────────────────────────────
 def save_profile(profile_data):
     try:
-        r = requests.post(f"{BASE_URL}/profile/save",
-                          json=profile_data, headers=get_headers())
+        r = _request("POST", "/profile/save",
+                     json=profile_data, headers=get_headers())
         return r.json(), r.status_code == 200
     except Exception:
         return {"detail": "Backend error"}, False
 
 def get_profile():
     try:
-        r = requests.get(f"{BASE_URL}/profile/me", headers=get_headers())
+        r = _request("GET", "/profile/me", headers=get_headers())
         return r.json(), r.status_code == 200
     except Exception:
         return {}, False
@@ -48,31 +226,31 @@ def get_profile():
 # ── ML ─────────────────────────────────────────────────────────────────────────
 def predict_workout(payload):
     try:
-        r = requests.post(f"{BASE_URL}/ml/workout-predict",
-                          json=payload, headers=get_headers())
+        r = _request("POST", "/ml/workout-predict",
+                     json=payload, headers=get_headers())
         return r.json(), r.status_code == 200
     except Exception:
         return {}, False
 
 def predict_injury(payload):
     try:
-        r = requests.post(f"{BASE_URL}/ml/injury-risk",
-                          json=payload, headers=get_headers())
+        r = _request("POST", "/ml/injury-risk",
+                     json=payload, headers=get_headers())
         return r.json(), r.status_code == 200
     except Exception:
         return {}, False
 
 def predict_calories_api(payload):
     try:
-        r = requests.post(f"{BASE_URL}/ml/calorie-predict",
-                          json=payload, headers=get_headers())
+        r = _request("POST", "/ml/calorie-predict",
+                     json=payload, headers=get_headers())
         return r.json(), r.status_code == 200
     except Exception:
         return {}, False
 
 def get_model_status():
     try:
-        r = requests.get(f"{BASE_URL}/ml/model-status", headers=get_headers())
+        r = _request("GET", "/ml/model-status", headers=get_headers())
         return r.json(), r.status_code == 200
     except Exception:
         return {}, False
@@ -80,38 +258,51 @@ def get_model_status():
 # ── Workouts ───────────────────────────────────────────────────────────────────
 def log_workout(payload):
     try:
-        r = requests.post(f"{BASE_URL}/workouts/log",
-                          json=payload, headers=get_headers())
+        r = _request("POST", "/workouts/log",
+                     json=payload, headers=get_headers())
         return r.json(), r.status_code == 200
     except Exception:
         return {}, False
 
-def get_workout_history():
+def get_workout_history(token=None):
     try:
-        r = requests.get(f"{BASE_URL}/workouts/history", headers=get_headers())
+        r = _request("GET", "/workouts/history", headers=get_headers(token))
         return r.json(), r.status_code == 200
     except Exception:
         return [], False
 
-def get_workout_stats():
+def get_workout_stats(token=None):
     try:
-        r = requests.get(f"{BASE_URL}/workouts/stats", headers=get_headers())
+        r = _request("GET", "/workouts/stats", headers=get_headers(token))
+        return r.json(), r.status_code == 200
+    except Exception:
+        return {}, False
+
+def get_workout_timeseries(bucket="day", start=None, end=None, token=None):
+    try:
+        params = {"bucket": bucket}
+        if start: params["start"] = str(start)
+        if end:   params["end"]   = str(end)
+        r = _request("GET", "/workouts/timeseries",
+                     params=params, headers=get_headers(token))
         return r.json(), r.status_code == 200
     except Exception:
         return {}, False
 
 def delete_workout(workout_id):
     try:
-        r = requests.delete(f"{BASE_URL}/workouts/delete/{workout_id}",
-                            headers=get_headers())
+        r = _request("DELETE", "/workouts/delete/{id}",
+                     path=f"/workouts/delete/{workout_id}", headers=get_headers())
         return r.json(), r.status_code == 200
     except Exception:
         return {}, False
 
 # ── Backend health check ───────────────────────────────────────────────────────
 def check_backend():
-    try:
-        r = requests.get(f"{BASE_URL}/health", timeout=30)
-        return r.status_code == 200
-    except Exception:
-        return False
+    """Cached health — never blocks on the network; the probe runs in the background."""
+    return health.allow()
+
+def backend_status():
+    """Breaker state ("closed" / "half-open" / "open"), failure count and last probe times."""
+    health.allow()
+    return health.status()
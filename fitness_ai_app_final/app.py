@@ -129,14 +129,16 @@ with st.sidebar:
         font-size:0.72rem;margin-bottom:0.2rem;">{'🟢' if exists else '🔴'} {label}</div>""",
         unsafe_allow_html=True)
 
-    # Backend status
+    # Backend status (cached by the health probe — never waits on the network)
     try:
-        from api_client import check_backend
-        be_ok = check_backend()
+        from api_client import backend_status
+        be_state = backend_status()["state"]
     except Exception:
-        be_ok = False
-    st.markdown(f"""<div style="color:{'#00ffe7' if be_ok else '#5a7a99'};
-    font-size:0.72rem;margin-top:0.2rem;">{'🟢' if be_ok else '🔴'} Backend API</div>""",
+        be_state = "open"
+    be_icon  = {"closed": "🟢", "half-open": "🟡"}.get(be_state, "🔴")
+    be_label = {"half-open": "Backend API (reconnecting)"}.get(be_state, "Backend API")
+    st.markdown(f"""<div style="color:{'#00ffe7' if be_state == 'closed' else '#5a7a99'};
+    font-size:0.72rem;margin-top:0.2rem;">{be_icon} {be_label}</div>""",
     unsafe_allow_html=True)
 
 # ── Page routing ───────────────────────────────────────────────────────────────
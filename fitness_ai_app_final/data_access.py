@@ -0,0 +1,102 @@
+"""
+data_access.py — Cached, concurrent page data on top of api_client
+Every widget interaction reruns the page script. Reads go through here so a
+rerun is served from st.cache_data instead of refetching. Independent calls
+for one page run concurrently on a thread pool.
+
+Cache entries are keyed by the user's token and a per-token generation.
+Writes (log_workout / delete_workout) bump the generation, so only that
+user's reads miss on the next rerun. Other users' entries are untouched.
+Failed responses are never cached.
+
+A token's generation is forgotten DATA_TTL after its last write: by then
+every cache entry made under an older generation has expired, so falling
+back to generation 0 cannot serve stale data, and the map stays bounded.
+"""
+import itertools
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import streamlit as st
+import api_client as api
+
+DATA_TTL      = float(os.getenv("FITAI_DATA_TTL", "60"))      # seconds a cached read stays fresh
+FETCH_WORKERS = int(os.getenv("FITAI_FETCH_WORKERS", "8"))
+
+_pool = ThreadPoolExecutor(max_workers=FETCH_WORKERS, thread_name_prefix="fitai-fetch")
+
+_generations      = OrderedDict()     # token -> (generation, written_at), oldest write first
+_generations_lock = threading.Lock()
+_next_generation  = itertools.count(1)
+
+class _Uncached(Exception):
+    """Carries a failed result out of a cached function so st.cache_data skips storing it."""
+    def __init__(self, value):
+        self.value = value
+
+def _token():
+    return st.session_state.get("token", "")
+
+def _generation(token):
+    with _generations_lock:
+        generation, _ = _generations.get(token, (0, 0.0))
+        return generation
+
+def invalidate(token=None):
+    """Drop the current user's cached reads (they are refetched on the next rerun)."""
+    token = _token() if token is None else token
+    now = time.monotonic()
+    with _generations_lock:
+        _generations.pop(token, None)
+        _generations[token] = (next(_next_generation), now)
+        while _generations and next(iter(_generations.values()))[1] < now - DATA_TTL:
+            _generations.popitem(last=False)
+
+def _gather(token, *calls):
+    """Run (fn, *args) api_client calls concurrently; results in call order."""
+    futures = [_pool.submit(fn, *args, token=token) for fn, *args in calls]
+    return [f.result() for f in futures]
+
+def _unwrap(fn, *args):
+    token = _token()
+    try:
+        return fn(token, _generation(token), *args)
+    except _Uncached as e:
+        return e.value
+
+# ── Cached reads ───────────────────────────────────────────────────────────────
+@st.cache_data(ttl=DATA_TTL, show_spinner=False)
+def _history_page(token, generation):
+    results = _gather(token, (api.get_workout_stats,), (api.get_workout_history,))
+    if not all(ok for _, ok in results):
+        raise _Uncached(results)
+    return results
+
+@st.cache_data(ttl=DATA_TTL, show_spinner=False)
+def _timeseries(token, generation, bucket):
+    result = api.get_workout_timeseries(bucket, token=token)
+    if not result[1]:
+        raise _Uncached(result)
+    return result
+
+def history_page():
+    """((stats, ok), (history, ok)) for the history page, fetched side by side."""
+    return _unwrap(_history_page)
+
+def workout_timeseries(bucket="day"):
+    return _unwrap(_timeseries, bucket)
+
+# ── Writes (invalidate on success) ─────────────────────────────────────────────
+def log_workout(payload):
+    result, ok = api.log_workout(payload)
+    if ok:
+        invalidate()
+    return result, ok
+
+def delete_workout(workout_id):
+    result, ok = api.delete_workout(workout_id)
+    if ok:
+        invalidate()
+    return result, ok
@@ -0,0 +1,154 @@
+"""
+artifacts.py — Content-addressed model artifact store for FitAI Pro
+Artifacts are keyed by a hash of the training CSV bytes, the feature list and
+the estimator parameters, so editing a dataset or a hyperparameter retrains.
+"""
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import numpy as np
+
+BASE_DIR      = os.path.dirname(__file__)
+ARTIFACT_DIR  = os.getenv("FITAI_ARTIFACT_DIR", os.path.join(BASE_DIR, "artifacts"))
+KEEP_VERSIONS = int(os.getenv("FITAI_KEEP_MODEL_VERSIONS", "3"))
+FORMAT        = 2   # bump when the artifact layout changes so old ones are retrained
+
+# Fixed-path pickles written before the artifact store. Nothing reads them any
+# more, so they are deleted the first time the model is loaded
+LEGACY_FILES = {
+    "workout":  os.path.join(BASE_DIR, "workout_model.pkl"),
+    "calories": os.path.join(BASE_DIR, "calories_model.pkl"),
+    "injury":   os.path.join(BASE_DIR, "injury_model.pkl"),
+}
+
+
+# ── Keys ───────────────────────────────────────────────────────────────────────
+def artifact_key(data_path, features, params):
+    """Hash of the dataset bytes (if any), artifact format, feature list and estimator params.
+
+    `data_path` may also be a list of files that make up one dataset; their
+    names are hashed along with their bytes.
+    """
+    h = hashlib.sha256()
+    paths = [data_path] if isinstance(data_path, str) or not data_path else list(data_path)
+    paths = [p for p in paths if p and os.path.exists(p)]
+    for path in paths:
+        if not isinstance(data_path, str):
+            h.update(os.path.basename(path).encode())
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+    if not paths:
+        h.update(b"synthetic")
+    h.update(f"format={FORMAT}".encode())
+    h.update(json.dumps(list(features)).encode())
+    h.update(json.dumps(params, sort_keys=True, default=str).encode())
+    return h.hexdigest()[:16]
+
+def artifact_path(name, key):
+    """Base path of an artifact: `<key>/` for array bundles, `<key>.pkl` for pickles."""
+    return os.path.join(ARTIFACT_DIR, name, key)
+
+
+# ── Read / write ───────────────────────────────────────────────────────────────
+def save_artifact(obj, path, to_arrays=None):
+    """Write an artifact atomically, then prune old versions.
+
+    If `to_arrays` turns the object into (arrays, meta) it is stored as a
+    directory of uncompressed .npy files plus meta.json, which load_artifact
+    memory-maps so all worker processes share the same page-cache pages.
+    Otherwise the object is pickled to `<path>.pkl`.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    mapped = to_arrays(obj) if to_arrays else None
+    tmp = f"{path}.{os.getpid()}.tmp"
+    if mapped is None:
+        with open(tmp, "wb") as f:
+            pickle.dump(obj, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path + ".pkl")
+    else:
+        arrays, meta = mapped
+        os.makedirs(tmp, exist_ok=True)
+        for k, v in arrays.items():
+            np.save(os.path.join(tmp, f"{k}.npy"), np.ascontiguousarray(v), allow_pickle=False)
+        with open(os.path.join(tmp, "meta.json"), "w") as f:
+            json.dump(meta, f, default=float)
+        try:
+            os.replace(tmp, path)
+        except OSError:
+            # Same key already written by another process — contents are identical
+            shutil.rmtree(tmp, ignore_errors=True)
+    prune(os.path.dirname(path), keep=path)
+
+def load_artifact(path, from_arrays=None):
+    """Load an artifact; a corrupted one is deleted and treated as missing."""
+    try:
+        if os.path.isdir(path):
+            arrays = {f[:-4]: np.load(os.path.join(path, f), mmap_mode="r", allow_pickle=False)
+                      for f in os.listdir(path) if f.endswith(".npy")}
+            with open(os.path.join(path, "meta.json")) as f:
+                meta = json.load(f)
+            return from_arrays(arrays, meta)
+        if os.path.exists(path + ".pkl"):
+            with open(path + ".pkl", "rb") as f:
+                return pickle.load(f)
+        return None
+    except Exception as e:
+        print(f"[FitAI] Discarding unreadable artifact {os.path.basename(path)}: {e}")
+        _remove(path)
+        return None
+
+def _remove(path):
+    shutil.rmtree(path, ignore_errors=True)
+    try:
+        os.remove(path + ".pkl")
+    except OSError:
+        pass
+
+def list_versions(name):
+    """Artifact base paths for a model, newest first."""
+    folder = os.path.join(ARTIFACT_DIR, name)
+    if not os.path.isdir(folder):
+        return []
+    paths = []
+    for f in os.listdir(folder):
+        if f.endswith((".tmp", ".lock")):
+            continue
+        if f.endswith(".pkl"):
+            paths.append(os.path.join(folder, f[:-4]))
+        elif os.path.isdir(os.path.join(folder, f)):
+            paths.append(os.path.join(folder, f))
+    return sorted(paths, key=_mtime, reverse=True)
+
+def _mtime(path):
+    return os.path.getmtime(path if os.path.isdir(path) else path + ".pkl")
+
+def latest_artifact(name, exclude=None, from_arrays=None):
+    """Newest readable artifact for a model other than `exclude`, or None."""
+    for path in list_versions(name):
+        if path == exclude:
+            continue
+        obj = load_artifact(path, from_arrays)
+        if obj is not None:
+            return obj
+    return None
+
+def remove_legacy(name):
+    """Delete the pre-store pickle of a model, if one is still lying around."""
+    legacy = LEGACY_FILES.get(name)
+    if legacy and os.path.exists(legacy):
+        try:
+            os.remove(legacy)
+            print(f"[FitAI] Removed legacy model file {os.path.basename(legacy)}")
+        except OSError:
+            pass
+
+def prune(folder, keep=None):
+    """Keep only the newest KEEP_VERSIONS artifacts (always keeping `keep`)."""
+    for path in list_versions(os.path.basename(folder))[KEEP_VERSIONS:]:
+        if path != keep:
+            _remove(path)
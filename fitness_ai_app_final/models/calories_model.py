@@ -1,37 +1,27 @@
-import pandas as pd
 import numpy as np
 from sklearn.ensemble import GradientBoostingRegressor
 from sklearn.preprocessing import StandardScaler
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import mean_absolute_error, r2_score
-import pickle, os
+from models import registry, trainer, artifacts, data_loader
+from models.forest import compile_boosting, boosting_predict, verify_boosting, split_arrays, join_arrays
 
-BASE_DIR   = os.path.dirname(__file__)
-DATA_PATH  = os.path.join(BASE_DIR, "..", "data", "calories.csv")
-EX_PATH    = os.path.join(BASE_DIR, "..", "data", "exercise.csv")
-MODEL_PATH = os.path.join(BASE_DIR, "calories_model.pkl")
+FEATURES   = ["age", "height", "weight", "duration", "heart_rate", "body_temp", "gender_enc"]
+PARAMS     = {"n_estimators": 200, "max_depth": 5, "learning_rate": 0.05, "random_state": 42}
 
 def load_real_dataset():
-    # Accept calories.csv directly
-    cal_path = DATA_PATH if os.path.exists(DATA_PATH) else EX_PATH
-    df = pd.read_csv(cal_path, encoding="utf-8", encoding_errors="replace")
-    df.columns = df.columns.str.strip().str.lower()
-    col_map = {}
-    for col in df.columns:
-        if "calor" in col:    col_map[col] = "calories"
-        if "duration" in col: col_map[col] = "duration"
-        if "age" in col:      col_map[col] = "age"
-        if "weight" in col:   col_map[col] = "weight"
-        if "height" in col:   col_map[col] = "height"
-        if "gender" in col:   col_map[col] = "gender"
-        if "heart" in col:    col_map[col] = "heart_rate"
-        if "temp" in col:     col_map[col] = "body_temp"
-    df = df.rename(columns=col_map)
-    df["gender_enc"] = (df.get("gender", pd.Series(["male"]*len(df))).str.lower() == "male").astype(int)
-    # Use available features
-    available = [c for c in ["age", "height", "weight", "duration", "heart_rate", "body_temp", "gender_enc"] if c in df.columns]
-    df = df.dropna(subset=available + ["calories"])
-    return df[available].values, df["calories"].values, available
+    """Features and target from exercise.csv merged with calories.csv.
+
+    calories.csv alone carries only User_ID and Calories, so without
+    exercise.csv there is nothing to learn from and this raises.
+    """
+    df, ok = data_loader.exercise_load()
+    if not ok:
+        raise ValueError("Calories dataset could not be loaded")
+    missing = [c for c in FEATURES if c not in df.columns]
+    if missing:
+        raise ValueError(f"Calories dataset lacks {missing} — add exercise.csv to data/")
+    return df[FEATURES].to_numpy(dtype=float), df["calories"].to_numpy(dtype=float), FEATURES
 
 def generate_synthetic_dataset():
     np.random.seed(99)
@@ -47,47 +37,77 @@ def generate_synthetic_dataset():
                 temp * 2.0 - 20 + np.random.normal(0, 5, n))
     return np.column_stack([age, height, weight, duration, hr, temp, gender]), np.clip(calories, 30, 600)
 
-def train_model():
-    csv_exists = os.path.exists(DATA_PATH) or os.path.exists(EX_PATH)
-    if os.path.exists(MODEL_PATH):
-        with open(MODEL_PATH, "rb") as f:
-            cached = pickle.load(f)
-        if csv_exists and not cached.get("real_data", False):
-            os.remove(MODEL_PATH)
-        else:
-            return cached
-
+def fit_model():
+    """Train a fresh calories model from the CSV, or synthetic data if it is missing."""
     using_real = False
-    if csv_exists:
-        try:
-            X, y, _ = load_real_dataset()
-            using_real = True
-        except Exception:
-            X, y = generate_synthetic_dataset()
-    else:
+    try:
+        X, y, _ = load_real_dataset()
+        using_real = True
+    except Exception as e:
+        print(f"[FitAI] Calories model using synthetic data: {e}")
         X, y = generate_synthetic_dataset()
 
     scaler = StandardScaler()
     X_s = scaler.fit_transform(X)
     X_train, X_test, y_train, y_test = train_test_split(X_s, y, test_size=0.2, random_state=42)
-    model = GradientBoostingRegressor(n_estimators=200, max_depth=5, learning_rate=0.05, random_state=42)
+    model = GradientBoostingRegressor(**PARAMS)
     model.fit(X_train, y_train)
     y_pred = model.predict(X_test)
-    result = {"model": model, "scaler": scaler,
+    # Flat-array export of the stages; only kept if it matches model.predict exactly
+    boosting = compile_boosting(model)
+    if not verify_boosting(boosting, model, X_test):
+        boosting = None
+    result = {"model": model, "scaler": scaler, "boosting": boosting,
+              "scaler_mean": scaler.mean_, "scaler_scale": scaler.scale_,
               "mae": round(mean_absolute_error(y_test, y_pred), 2),
               "r2": round(r2_score(y_test, y_pred), 3),
               "real_data": using_real, "n_samples": len(X)}
-    with open(MODEL_PATH, "wb") as f:
-        pickle.dump(result, f)
     return result
 
+def to_arrays(result):
+    """(arrays, meta) for the memory-mapped artifact, or None to pickle instead."""
+    if result.get("boosting") is None:
+        return None
+    arrays, meta = split_arrays(result["boosting"], "boosting")
+    arrays.update({k: result[k] for k in ("scaler_mean", "scaler_scale")})
+    meta.update({k: result[k] for k in ("mae", "r2", "real_data", "n_samples", "version")})
+    return arrays, meta
+
+def from_arrays(arrays, meta):
+    """Predict-capable bundle backed by memory-mapped arrays — no sklearn objects."""
+    result = {k: v for k, v in meta.items() if not k.startswith("boosting_")}
+    result["boosting"] = join_arrays(arrays, meta, "boosting")
+    result.update({k: arrays[k] for k in ("scaler_mean", "scaler_scale")})
+    return result
+
+def train_model():
+    key = artifacts.artifact_key(data_loader.dataset_paths("calories"), FEATURES,
+                                 {**PARAMS, "loader": data_loader.SNAPSHOT_FORMAT})
+    return trainer.load_or_train("calories", __name__, key)
+
+def calories_features(age, weight, height, duration_mins, heart_rate=120, body_temp=38.5, gender="Male"):
+    """Raw (unscaled) feature row used by the calories model."""
+    return [age, height, weight, duration_mins,
+            heart_rate, body_temp, 1 if gender=="Male" else 0]
+
+def predict_calories_batch(rows):
+    """Predict calories for a list of keyword dicts in one model call."""
+    if not rows:
+        return []
+    r = registry.get("calories")
+    X = np.array([calories_features(**row) for row in rows], dtype=float)
+    if r.get("boosting") is None:
+        return [round(float(c), 1) for c in r["model"].predict(r["scaler"].transform(X))]
+    X = (X - r["scaler_mean"]) / r["scaler_scale"]
+    return [round(float(c), 1) for c in boosting_predict(r["boosting"], X)]
+
 def predict_calories(age, weight, height, duration_mins, heart_rate=120, body_temp=38.5, gender="Male"):
-    r = train_model()
-    X = r["scaler"].transform([[age, height, weight, duration_mins,
-                                heart_rate, body_temp, 1 if gender=="Male" else 0]])
-    return round(float(r["model"].predict(X)[0]), 1)
+    return predict_calories_batch([dict(age=age, weight=weight, height=height,
+                                        duration_mins=duration_mins, heart_rate=heart_rate,
+                                        body_temp=body_temp, gender=gender)])[0]
 
 def get_calories_model_stats():
-    r = train_model()
+    r = registry.get("calories")
     return {"mae": r.get("mae","N/A"), "r2": r.get("r2","N/A"),
-            "real_data": r.get("real_data", False), "n_samples": r.get("n_samples", 0)}
+            "real_data": r.get("real_data", False), "n_samples": r.get("n_samples", 0),
+            "version": r.get("version")}
@@ -1,10 +1,26 @@
 """
 data_loader.py — Central data loading utility for FitAI Pro
-Handles all 3 real datasets with automatic fallback to synthetic data
+Handles all 3 real datasets with automatic fallback to synthetic data.
+Columns are resolved and typed from the declarations in dataset_schemas, so
+every consumer gets the same compact frame.
+Parsed frames are cached once per process (shared by every Streamlit session)
+and re-read only when a file's mtime or size changes. The normalized frame
+is also written as an uncompressed Feather (Arrow IPC) snapshot next to the
+data, keyed by a hash of the CSV bytes, so a cold start memory-maps it instead
+of parsing and normalizing the CSV again.
 """
+import hashlib
+import json
 import os
+import threading
 import pandas as pd
 import numpy as np
+from models.dataset_schemas import SCHEMAS, resolve_columns, coerce
+
+try:
+    import pyarrow.feather as feather
+except ImportError:
+    feather = None
 
 BASE_DIR = os.path.dirname(os.path.dirname(__file__))
 DATA_DIR = os.path.join(BASE_DIR, "data")
@@ -14,145 +30,221 @@ NUTRITION_PATH = os.path.join(DATA_DIR, "nutrition.csv")
 EXERCISE_PATH  = os.path.join(DATA_DIR, "exercise.csv")
 CALORIES_PATH  = os.path.join(DATA_DIR, "calories.csv")
 
+SNAPSHOT_DIR    = os.getenv("FITAI_DATASET_CACHE", os.path.join(DATA_DIR, ".cache"))
+SNAPSHOTS       = os.getenv("FITAI_DATASET_SNAPSHOTS", "1") != "0"
+SNAPSHOT_FORMAT = 3   # bump when the loader's output changes; also retrains models built on it
 
-# ── 1. Body Performance Dataset ───────────────────────────────────────────────
-def load_body_performance():
-    """Load Kaggle Body Performance dataset."""
-    if not os.path.exists(BODY_PERF_PATH):
-        return None, False
 
-    try:
-        df = pd.read_csv(BODY_PERF_PATH)
-        df.columns = df.columns.str.strip().str.lower().str.replace(" ", "_")
-
-        # Rename common variations
-        rename_map = {}
-        for col in df.columns:
-            if "sit" in col and "up" in col:  rename_map[col] = "situps"
-            if "broad" in col:                rename_map[col] = "broad_jump"
-            if "height" in col:               rename_map[col] = "height_cm"
-            if "weight" in col:               rename_map[col] = "weight_kg"
-        df = df.rename(columns=rename_map)
-
-        df["gender_enc"] = (df["gender"].str.strip().str.lower() == "m").astype(int)
-
-        grade_map = {"A": "Advanced", "B": "Intermediate", "C": "Intermediate", "D": "Beginner"}
-        df["workout_level"] = df["class"].map(grade_map)
-        df = df.dropna(subset=["workout_level", "situps", "broad_jump", "height_cm", "weight_kg"])
-        return df, True
-    except Exception as e:
-        print(f"[FitAI] Body Performance load error: {e}")
-        return None, False
+# ── Process-wide dataset cache ─────────────────────────────────────────────────
+_cache      = {}   # dataset name -> (signature, frame)
+_cache_lock = threading.Lock()
 
+def _signature(paths):
+    """(path, mtime_ns, size) of every file, or None if one does not exist."""
+    sig = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        sig.append((path, st.st_mtime_ns, st.st_size))
+    return tuple(sig)
 
-# ── 2. Nutrition Dataset ───────────────────────────────────────────────────────
-def load_nutrition():
-    """Load Nutrition dataset."""
-    if not os.path.exists(NUTRITION_PATH):
+def dataset_paths(name):
+    """The files a dataset is currently read from (empty if none are present)."""
+    schema  = SCHEMAS[name]
+    present = [os.path.join(DATA_DIR, f) for f in schema["files"]
+               if os.path.exists(os.path.join(DATA_DIR, f))]
+    return present if schema.get("join") else present[:1]
+
+def _read_only(df):
+    """Rebuild a frame over non-writeable views so a caller cannot corrupt the shared copy.
+
+    No data is copied; memory-mapped snapshot columns stay backed by the file.
+    Categorical columns are passed through as they are.
+    """
+    arrays = {}
+    for col in df.columns:
+        if not isinstance(df[col].dtype, np.dtype):
+            arrays[col] = df[col].array
+            continue
+        arr = df[col].to_numpy()
+        arr.flags.writeable = False
+        arrays[col] = arr
+    return pd.DataFrame(arrays, index=df.index, copy=False)
+
+def load_dataset(name):
+    """Return (df, ok) for a dataset in SCHEMAS, parsing only when its files changed.
+
+    Frames are read-only and shared — derive a copy before modifying one.
+    Failed parses are not cached, so a file that was locked or half-written
+    is retried on the next call.
+    """
+    paths = dataset_paths(name)
+    sig = _signature(paths) if paths else None
+    if sig is None:
         return None, False
+    hit = _cache.get(name)
+    if hit is not None and hit[0] == sig:
+        return hit[1], True
+    with _cache_lock:
+        hit = _cache.get(name)
+        if hit is not None and hit[0] == sig:
+            return hit[1], True
+        df, ok = _load(name, paths)
+        if not ok or df is None:
+            return df, ok
+        df = _read_only(df)
+        _cache[name] = (sig, df)
+        return df, True
+
+def clear_cache():
+    """Forget every parsed dataset (the next load re-reads the files or snapshots)."""
+    with _cache_lock:
+        _cache.clear()
+
 
+# ── Columnar snapshots ─────────────────────────────────────────────────────────
+def _snapshot_path(name, paths):
+    """Snapshot file for a dataset: <name>-<hash of its CSV bytes and schema>.feather."""
+    h = hashlib.sha256()
+    for path in paths:
+        h.update(os.path.basename(path).encode())
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+    h.update(json.dumps(SCHEMAS[name], sort_keys=True).encode())
+    h.update(f"format={SNAPSHOT_FORMAT}".encode())
+    return os.path.join(SNAPSHOT_DIR, f"{name}-{h.hexdigest()[:16]}.feather")
+
+def _load(name, paths):
+    """Normalized (df, ok) from the snapshot if one matches the CSVs, else parse and snapshot it."""
+    if feather is None or not SNAPSHOTS:
+        return _parse(name, paths)
     try:
-        df = pd.read_csv(NUTRITION_PATH, encoding="utf-8", encoding_errors="replace")
-        df.columns = df.columns.str.strip().str.lower()
-
-        # Rename columns to standard names
-        col_map = {}
-        for col in df.columns:
-            if col in ["name", "food", "item", "description"]:
-                col_map[col] = "food_name"
-            elif "calor" in col and col != "food_name":
-                col_map[col] = "calories"
-            elif col.startswith("protein"):
-                col_map[col] = "protein"
-            elif col.startswith("fat") or col == "total_fat" or col == "total fat":
-                col_map[col] = "fat"
-            elif "carb" in col:
-                col_map[col] = "carbs"
-            elif "fiber" in col:
-                col_map[col] = "fiber"
-            elif "sugar" in col:
-                col_map[col] = "sugar"
-            elif "sodium" in col:
-                col_map[col] = "sodium"
-        df = df.rename(columns=col_map)
-
-        # If still no food_name, use index
-        if "food_name" not in df.columns:
-            df["food_name"] = df.index.astype(str)
-
-        required = ["food_name", "calories", "protein", "fat", "carbs"]
-        missing = [c for c in required if c not in df.columns]
-        if missing:
-            print(f"[FitAI] Nutrition dataset missing columns: {missing}")
-            return None, False
+        snapshot = _snapshot_path(name, paths)
+    except OSError:
+        return _parse(name, paths)   # unreadable CSV — let the parser report it
 
-        df = df.dropna(subset=required)
-        for col in ["calories", "protein", "fat", "carbs"]:
-            df[col] = pd.to_numeric(df[col], errors="coerce")
-        df = df.dropna(subset=required)
-        df = df[df["calories"] > 0]
-        df = df[df["calories"] < 2000]
+    if os.path.exists(snapshot):
+        try:
+            table = feather.read_table(snapshot, memory_map=True)
+            return table.to_pandas(split_blocks=True), True
+        except Exception as e:
+            print(f"[FitAI] Discarding unreadable snapshot {os.path.basename(snapshot)}: {e}")
+            _remove(snapshot)
 
-        extra = [c for c in ["fiber", "sugar", "sodium"] if c in df.columns]
-        return df[["food_name", "calories", "protein", "fat", "carbs"] + extra].reset_index(drop=True), True
+    df, ok = _parse(name, paths)
+    if ok and df is not None:
+        _write_snapshot(df, snapshot)
+    return df, ok
 
-    except PermissionError:
-        print(f"[FitAI] nutrition.csv is open in another program. Close it and restart.")
-        return None, False
+def _write_snapshot(df, snapshot):
+    """Write atomically, then drop older snapshots of the same dataset."""
+    tmp = f"{snapshot}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+        feather.write_feather(df, tmp, compression="uncompressed")
+        os.replace(tmp, snapshot)
     except Exception as e:
-        print(f"[FitAI] Nutrition load error: {e}")
-        return None, False
+        print(f"[FitAI] Could not write dataset snapshot {os.path.basename(snapshot)}: {e}")
+        _remove(tmp)
+        return
+    prefix = os.path.basename(snapshot).rsplit("-", 1)[0] + "-"
+    for f in os.listdir(SNAPSHOT_DIR):
+        if f.startswith(prefix) and f.endswith(".feather") and f != os.path.basename(snapshot):
+            _remove(os.path.join(SNAPSHOT_DIR, f))
 
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
 
-# ── 3. Exercise / Calories Burned Dataset ─────────────────────────────────────
-def exercise_load():
-    """Load Kaggle Exercise & Calories dataset — accepts exercise.csv OR calories.csv."""
-    # Accept either filename
-    path = None
-    if os.path.exists(EXERCISE_PATH):
-        path = EXERCISE_PATH
-    elif os.path.exists(CALORIES_PATH):
-        path = CALORIES_PATH
-
-    if path is None:
-        return None, False
 
+# ── Parsing ────────────────────────────────────────────────────────────────────
+def _read_file(path, schema):
+    """Read only the declared columns of one CSV, renamed to their canonical names."""
+    header  = pd.read_csv(path, nrows=0, encoding="utf-8", encoding_errors="replace").columns
+    mapping = resolve_columns(header, schema)
+    df = pd.read_csv(path, usecols=list(mapping), encoding="utf-8", encoding_errors="replace")
+    return df.rename(columns=mapping)
+
+def _parse(name, paths):
+    """Read, merge, coerce and derive a dataset; (None, False) if it cannot be used."""
+    schema = SCHEMAS[name]
     try:
-        df = pd.read_csv(path, encoding="utf-8", encoding_errors="replace")
-        df.columns = df.columns.str.strip().str.lower()
-
-        col_map = {}
-        for col in df.columns:
-            if "calor" in col:    col_map[col] = "calories"
-            if "duration" in col: col_map[col] = "duration"
-            if "age" in col:      col_map[col] = "age"
-            if "weight" in col:   col_map[col] = "weight"
-            if "gender" in col:   col_map[col] = "gender"
-            if "heart" in col:    col_map[col] = "heart_rate"
-        df = df.rename(columns=col_map)
-
-        required = ["calories"]
-        missing = [c for c in required if c not in df.columns]
+        frames = [_read_file(path, schema) for path in paths]
+        df = frames[0]
+        for other in frames[1:]:
+            key = schema["join"]
+            other = other[[key] + [c for c in other.columns if c not in df.columns]]
+            df = df.merge(other, on=key, how="inner")
+
+        missing = [c for c in schema["required"] if c not in df.columns]
         if missing:
+            print(f"[FitAI] {name} dataset missing columns: {missing}")
             return None, False
 
-        df["calories"] = pd.to_numeric(df["calories"], errors="coerce")
-        df = df.dropna(subset=["calories"])
-        df = df[df["calories"] > 0]
-        return df, True
-    except PermissionError:
-        print(f"[FitAI] calories.csv is open in another program. Close it and restart.")
+        df = coerce(df, schema)
+        df = DERIVE[name](df) if name in DERIVE else df
+        return df.reset_index(drop=True), True   # snapshots cannot keep a gapped index
+    except PermissionError as e:
+        print(f"[FitAI] {os.path.basename(e.filename or name)} is open in another program. "
+              f"Close it and restart.")
         return None, False
     except Exception as e:
-        print(f"[FitAI] Exercise load error: {e}")
+        print(f"[FitAI] {name} load error: {e}")
         return None, False
 
+def _derive_body_performance(df):
+    df["gender_enc"] = (df["gender"].str.lower() == "m").astype("int8")
+    grade_map = {"A": "Advanced", "B": "Intermediate", "C": "Intermediate", "D": "Beginner"}
+    df["workout_level"] = df["class"].map(grade_map).astype("category")
+    return df.dropna(subset=["workout_level"])
+
+def _derive_calories(df):
+    if "gender" in df.columns:
+        df["gender_enc"] = (df["gender"].str.lower() == "male").astype("int8")
+    return df[df["calories"] > 0]
+
+def _derive_nutrition(df):
+    # If still no food_name, use index
+    if "food_name" not in df.columns:
+        df.insert(0, "food_name", df.index.astype(str))
+    return df[(df["calories"] > 0) & (df["calories"] < 2000)]
+
+DERIVE = {
+    "body_performance": _derive_body_performance,
+    "calories":         _derive_calories,
+    "nutrition":        _derive_nutrition,
+}
+
+
+# ── Datasets ───────────────────────────────────────────────────────────────────
+def load_body_performance():
+    """Load Kaggle Body Performance dataset."""
+    return load_dataset("body_performance")
+
+def load_nutrition():
+    """Load Nutrition dataset (nutrition.csv, or the USDA food.csv)."""
+    return load_dataset("nutrition")
+
+def exercise_load():
+    """Load Kaggle Exercise & Calories dataset — exercise.csv and calories.csv, merged if both exist."""
+    return load_dataset("calories")
+
 
 # ── Dataset status summary ─────────────────────────────────────────────────────
+def _available(name):
+    """Files present and non-empty — a stat call, never a parse."""
+    sig = _signature(dataset_paths(name))
+    return bool(sig) and all(size > 0 for _, _, size in sig)
+
 def get_dataset_status():
-    _, bp = load_body_performance()
-    _, nu = load_nutrition()
-    _, ex = exercise_load()
+    bp = _available("body_performance")
+    nu = _available("nutrition")
+    ex = _available("calories")
     return {
         "body_performance": bp,
         "nutrition":        nu,
@@ -0,0 +1,105 @@
+"""
+dataset_schemas.py — Declarative schema for every bundled dataset
+One entry per dataset: the files it is read from, each canonical column with
+its compact dtype and the header spellings it may appear under, and the
+columns a row cannot be missing. data_loader resolves headers against this
+once per file, so every consumer gets the same column names and dtypes.
+"""
+import re
+import pandas as pd
+
+# files:    candidate files in data/. Without "join" the first one present is
+#           used; with "join" every file present is merged on that column.
+# columns:  canonical name -> (dtype, header aliases after normalize_header).
+#           Aliases must match exactly — "age" never matches "average".
+# required: rows missing any of these are dropped; the dataset fails to load
+#           if one of them has no matching header at all.
+SCHEMAS = {
+    "body_performance": {
+        "files": ["bodyPerformance.csv"],
+        "columns": {
+            "age":          ("int16",    ["age"]),
+            "gender":       ("category", ["gender", "sex"]),
+            "height_cm":    ("float32",  ["height_cm", "height"]),
+            "weight_kg":    ("float32",  ["weight_kg", "weight"]),
+            "body_fat":     ("float32",  ["body_fat", "body_fat_pct"]),
+            "diastolic":    ("float32",  ["diastolic"]),
+            "systolic":     ("float32",  ["systolic"]),
+            "grip_force":   ("float32",  ["gripforce", "grip_force"]),
+            "sit_and_bend": ("float32",  ["sit_and_bend_forward_cm", "sit_and_bend_forward"]),
+            "situps":       ("float32",  ["sit_ups_counts", "sit_ups", "situps"]),
+            "broad_jump":   ("float32",  ["broad_jump_cm", "broad_jump"]),
+            "class":        ("category", ["class", "grade"]),
+        },
+        "required": ["age", "gender", "height_cm", "weight_kg", "situps", "broad_jump", "class"],
+    },
+    # Kaggle "Calories Burned": exercise.csv holds the features, calories.csv the target
+    "calories": {
+        "files": ["exercise.csv", "calories.csv"],
+        "join":  "user_id",
+        "columns": {
+            "user_id":    ("int64",    ["user_id", "userid", "id"]),
+            "gender":     ("category", ["gender", "sex"]),
+            "age":        ("int16",    ["age"]),
+            "height":     ("float32",  ["height", "height_cm"]),
+            "weight":     ("float32",  ["weight", "weight_kg"]),
+            "duration":   ("float32",  ["duration", "duration_min", "duration_mins"]),
+            "heart_rate": ("float32",  ["heart_rate", "heartrate", "avg_heart_rate"]),
+            "body_temp":  ("float32",  ["body_temp", "body_temperature", "temperature"]),
+            "calories":   ("float32",  ["calories", "calories_burned", "calorie"]),
+        },
+        "required": ["calories"],
+    },
+    # nutrition.csv is the bundled table; food.csv is the USDA download
+    "nutrition": {
+        "files": ["nutrition.csv", "food.csv"],
+        "columns": {
+            "food_name": ("object",  ["food_name", "name", "food", "item", "description", "shrt_desc"]),
+            "calories":  ("float32", ["calories", "kcal", "energy_kcal", "energ_kcal", "data_kilocalories"]),
+            "protein":   ("float32", ["protein", "protein_g", "data_protein"]),
+            "fat":       ("float32", ["fat", "total_fat", "fat_g", "lipid_tot_g", "data_fat_total_lipid"]),
+            "carbs":     ("float32", ["carbs", "carbohydrate", "carbohydrates", "carbohydrt_g",
+                                      "data_carbohydrate"]),
+            "fiber":     ("float32", ["fiber", "fibre", "fiber_td_g", "data_fiber"]),
+            "sugar":     ("float32", ["sugar", "sugars", "sugar_tot_g", "data_sugar_total"]),
+            "sodium":    ("float32", ["sodium", "sodium_mg", "data_major_minerals_sodium"]),
+        },
+        "required": ["calories", "protein", "fat", "carbs"],
+    },
+}
+
+
+def normalize_header(name):
+    """'sit-ups counts' -> 'sit_ups_counts', 'Body Fat_%' -> 'body_fat'."""
+    return re.sub(r"[^0-9a-z]+", "_", str(name).strip().lower()).strip("_")
+
+def resolve_columns(header, schema):
+    """{raw header: canonical column} for the headers of one file; unknown headers are left out."""
+    normalized = {}
+    for raw in header:
+        normalized.setdefault(normalize_header(raw), raw)
+    mapping = {}
+    for canonical, (_, aliases) in schema["columns"].items():
+        raw = next((normalized[a] for a in aliases if a in normalized), None)
+        if raw is not None and raw not in mapping:
+            mapping[raw] = canonical
+    return mapping
+
+def coerce(df, schema):
+    """Drop rows missing a required column, then cast every column to its declared dtype."""
+    columns = schema["columns"]
+    for col in df.columns:
+        if columns[col][0] not in ("object", "category"):
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+    df = df.dropna(subset=[c for c in schema["required"] if c in df.columns])
+    for col in df.columns:
+        dtype = columns[col][0]
+        if dtype == "object":
+            df[col] = df[col].astype(str).str.strip()
+        elif dtype == "category":
+            df[col] = df[col].astype(str).str.strip().astype("category")
+        elif dtype.startswith("int") and (df[col].isna().any() or (df[col] % 1 != 0).any()):
+            df[col] = df[col].astype("float32")   # gaps or fractions: an int cast would lose them
+        else:
+            df[col] = df[col].astype(dtype)
+    return df
@@ -0,0 +1,220 @@
+"""
+food_search.py — Indexed food name search for the nutrition pages
+Names are lowercased and tokenized once when the index is built. A query is
+answered from a token inverted index (exact and prefix matches) and a
+trigram index over the token vocabulary (substring and typo matches), so it
+never scans the food table. 1-2 letter words, too short for trigrams, are
+found inside tokens by scanning the vocabulary. Results are ranked best first.
+"""
+import bisect
+import re
+import threading
+from collections import defaultdict, OrderedDict
+import numpy as np
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+# Score a row gets for a query word, by how the word matched one of its tokens
+EXACT, PREFIX, SUBSTRING, FUZZY = 1.0, 0.8, 0.6, 0.4
+MIN_SIMILARITY = 0.3    # share of the query word's trigrams a candidate must have
+MAX_EXPANSIONS = 64     # vocabulary tokens one query word may expand to
+RERANK         = 5      # candidates re-scored on the full name, per result asked for
+
+
+def tokenize(text):
+    return _TOKEN.findall(str(text).lower())
+
+def _trigrams(token):
+    """Trigrams of the token padded with '$', so short words and typos still share some."""
+    token = f"${token}$"
+    return {token[i:i + 3] for i in range(len(token) - 2)}
+
+def _max_edits(word):
+    return 1 if len(word) <= 5 else 2
+
+def _within_edits(a, b, limit):
+    """Levenshtein distance of a and b is at most `limit`."""
+    if abs(len(a) - len(b)) > limit:
+        return False
+    prev = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        cur = [i]
+        for j, cb in enumerate(b, 1):
+            cur.append(min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (ca != cb)))
+        if min(cur) > limit:
+            return False
+        prev = cur
+    return prev[-1] <= limit
+
+
+class FoodIndex:
+    """Search index over a sequence of food names; results are row positions."""
+
+    def __init__(self, names):
+        self.names = [str(n).lower() for n in names]
+        postings = defaultdict(list)
+        for row, name in enumerate(self.names):
+            for tok in set(tokenize(name)):
+                postings[tok].append(row)
+        # Vocabulary ids are sorted positions, so a prefix is a contiguous id range
+        self.vocab    = sorted(postings)
+        # All tokens in one newline-separated string, for substring scans of short words
+        self.vocab_text   = "\n".join(self.vocab)
+        self.vocab_starts = np.cumsum([0] + [len(t) + 1 for t in self.vocab[:-1]], dtype=np.int64)
+        self.postings = [np.array(postings[t], dtype=np.int32) for t in self.vocab]
+        self.freq     = np.array([len(p) for p in self.postings], dtype=np.int32)
+        grams = defaultdict(list)
+        for vid, tok in enumerate(self.vocab):
+            for g in _trigrams(tok):
+                grams[g].append(vid)
+        self.trigrams = {g: np.array(v, dtype=np.int32) for g, v in grams.items()}
+
+    def __len__(self):
+        return len(self.names)
+
+    # ── Matching one query word ────────────────────────────────────────────────
+    def _prefix_range(self, word):
+        lo = bisect.bisect_left(self.vocab, word)
+        hi = bisect.bisect_left(self.vocab, word + "\x7f")   # tokens are [a-z0-9] only
+        return lo, hi
+
+    def _most_frequent(self, ids):
+        if len(ids) <= MAX_EXPANSIONS:
+            return ids
+        return ids[np.argsort(-self.freq[ids], kind="stable")[:MAX_EXPANSIONS]]
+
+    def _expand(self, word):
+        """{vocab id: score} for the tokens a query word matches."""
+        matches = {}
+        lo, hi = self._prefix_range(word)
+        if lo < hi and self.vocab[lo] == word:
+            matches[lo] = EXACT
+        for vid in self._most_frequent(np.arange(lo, hi)):
+            matches.setdefault(int(vid), PREFIX)
+        if len(word) < 3:
+            # Padded trigrams cannot find a 1-2 letter word inside a token, so scan the vocabulary
+            hits = [m.start() for m in re.finditer(re.escape(word), self.vocab_text)]
+            inside = np.unique(np.searchsorted(self.vocab_starts, hits, side="right") - 1)
+            for vid in self._most_frequent(inside).tolist():
+                matches.setdefault(vid, SUBSTRING)
+
+        # Substrings always; typos only when the word matched no token or prefix
+        typos = not matches and len(word) >= 4
+        grams = _trigrams(word)
+        hits  = [self.trigrams[g] for g in grams if g in self.trigrams]
+        if hits:
+            ids, counts = np.unique(np.concatenate(hits), return_counts=True)
+            sim  = counts / len(grams)
+            keep = sim >= MIN_SIMILARITY
+            ids, sim = ids[keep], sim[keep]
+            order = np.argsort(-sim, kind="stable")[:MAX_EXPANSIONS]
+            for vid, s in zip(ids[order].tolist(), sim[order].tolist()):
+                if vid in matches:
+                    continue
+                token = self.vocab[vid]
+                if word in token:
+                    matches[vid] = SUBSTRING
+                elif typos and _within_edits(word, token, _max_edits(word)):
+                    matches[vid] = FUZZY * s
+        return matches
+
+    def _rows(self, matches):
+        """(rows, score) sorted by row, keeping each row's best-matching token."""
+        if not matches:
+            return np.empty(0, np.int32), np.empty(0, np.float32)
+        vids   = list(matches)
+        if len(vids) == 1:
+            rows = self.postings[vids[0]]
+            return rows, np.full(len(rows), matches[vids[0]], dtype=np.float32)
+        vids   = sorted(vids, key=matches.get, reverse=True)
+        rows   = np.concatenate([self.postings[v] for v in vids])
+        scores = np.repeat(np.array([matches[v] for v in vids], dtype=np.float32),
+                           self.freq[vids])
+        order  = np.argsort(rows, kind="stable")   # best score first within a row
+        rows, scores = rows[order], scores[order]
+        first = np.ones(len(rows), dtype=bool)
+        first[1:] = rows[1:] != rows[:-1]
+        return rows[first], scores[first]
+
+    # ── Queries ────────────────────────────────────────────────────────────────
+    def search(self, query, limit=10):
+        """Row positions of the best matches for `query`, best first.
+
+        Rows matching every word are preferred; if there are none, rows
+        matching any word are ranked by how many words (and how well) they match.
+        """
+        words = tokenize(query)
+        if not words:
+            return np.empty(0, np.int32)
+        per_word = [self._rows(self._expand(w)) for w in words]
+
+        # Intersect starting from the rarest word: binary-search its rows in the others
+        rarest = min(range(len(per_word)), key=lambda i: len(per_word[i][0]))
+        rows, scores = per_word[rarest]
+        for i, (r, s) in enumerate(per_word):
+            if i == rarest or len(rows) == 0:
+                continue
+            if len(r) == 0:
+                rows, scores = rows[:0], scores[:0]
+                continue
+            idx = np.minimum(np.searchsorted(r, rows), len(r) - 1)
+            hit = r[idx] == rows
+            rows, scores = rows[hit], scores[hit] + s[idx[hit]]
+        if len(rows) == 0 and len(per_word) > 1:
+            rows   = np.concatenate([r for r, _ in per_word])
+            scores = np.concatenate([s for _, s in per_word])
+            order  = np.argsort(rows, kind="stable")
+            rows, start = np.unique(rows[order], return_index=True)
+            scores = np.add.reduceat(scores[order], start) if len(rows) else scores[:0]
+        if len(rows) == 0:
+            return rows
+
+        # Re-score the leading candidates on the whole name
+        k = min(len(rows), max(limit * RERANK, 50))
+        top = np.argpartition(-scores, k - 1)[:k] if k < len(rows) else np.arange(len(rows))
+        phrase = " ".join(words)
+        ranked = []
+        for i in top.tolist():
+            row  = int(rows[i])
+            name = self.names[row]
+            bonus = (1.0 if name == phrase else 0.0) + (0.5 if name.startswith(phrase) else 0.0) \
+                    + (0.3 if phrase in name else 0.0)
+            ranked.append((-(scores[i] + bonus), len(name), row))
+        ranked.sort()
+        return np.array([row for _, _, row in ranked[:limit]], dtype=np.int32)
+
+    def complete(self, prefix, limit=8):
+        """Completions of the word being typed, most common first: 'grilled chi' -> 'grilled chicken'."""
+        text = str(prefix).lower()
+        words = tokenize(text)
+        if not words or not text[-1:].isalnum():
+            return []
+        lo, hi = self._prefix_range(words[-1])
+        head = text[:text.rfind(words[-1])]
+        return [head + self.vocab[v] for v in self._most_frequent(np.arange(lo, hi))[:limit].tolist()]
+
+
+# ── Index per frame ────────────────────────────────────────────────────────────
+_indexes      = OrderedDict()   # id(frame) -> (frame, index); the frame pins the id
+_indexes_lock = threading.Lock()
+MAX_INDEXES   = 4
+
+def index_for(df, column="food_name"):
+    """FoodIndex over df[column], built once per frame.
+
+    The shared dataset frame from data_loader is reused until its CSV changes,
+    so the index is built once per process in practice.
+    """
+    key = (id(df), column)
+    hit = _indexes.get(key)
+    if hit is not None and hit[0] is df:
+        return hit[1]
+    with _indexes_lock:
+        hit = _indexes.get(key)
+        if hit is not None and hit[0] is df:
+            return hit[1]
+        index = FoodIndex(df[column].tolist())
+        _indexes[key] = (df, index)
+        while len(_indexes) > MAX_INDEXES:
+            _indexes.popitem(last=False)
+        return index
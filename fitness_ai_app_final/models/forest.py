@@ -0,0 +1,129 @@
+"""
+forest.py — Flat array-backed evaluators for the tree-ensemble models
+Exports a fitted RandomForestClassifier (workout) or GradientBoostingRegressor
+(calories) into contiguous NumPy arrays and scores rows with plain vectorised
+NumPy, keeping sklearn out of the hot path. The arrays can be saved as .npy
+files and memory-mapped back, so every worker shares one copy.
+"""
+import numpy as np
+
+
+def _flatten(trees, n_features, normalise):
+    features, thresholds, children, values, roots = [], [], [], [], []
+    offset, depth = 0, 0
+    for t in trees:
+        leaf = t.children_left == -1
+        features.append(np.where(leaf, 0, t.feature))
+        thresholds.append(t.threshold)
+        # Interleaved [right, left] per node, indexed by 2 * node + go_left.
+        # Leaves point at themselves so extra descent steps are no-ops.
+        own = np.arange(offset, offset + t.node_count)
+        children.append(np.column_stack([np.where(leaf, own, t.children_right + offset),
+                                         np.where(leaf, own, t.children_left + offset)]).ravel())
+        v = t.value[:, 0, :].astype(np.float64)
+        if normalise:
+            # Same per-tree normalisation as DecisionTreeClassifier.predict_proba
+            norm = v.sum(axis=1, keepdims=True)
+            norm[norm == 0] = 1
+            v = v / norm
+        values.append(v)
+        roots.append(offset)
+        offset += t.node_count
+        depth = max(depth, t.max_depth)
+    return {
+        "feature":   np.ascontiguousarray(np.concatenate(features), dtype=np.intp),
+        "threshold": np.ascontiguousarray(np.concatenate(thresholds), dtype=np.float64),
+        "children":  np.ascontiguousarray(np.concatenate(children), dtype=np.intp),
+        "value":     np.ascontiguousarray(np.concatenate(values), dtype=np.float64),
+        "roots":     np.asarray(roots, dtype=np.intp),
+        "max_depth":  int(depth),
+        "n_features": int(n_features),
+    }
+
+
+def _leaf_values(forest, X):
+    """Leaf value of every tree for every row, shape (rows, trees, outputs)."""
+    # sklearn trees compare float32 inputs against float64 thresholds
+    X = np.atleast_2d(np.asarray(X, dtype=np.float32))
+    n, n_features = X.shape
+    if n_features != forest["n_features"]:
+        raise ValueError(f"X has {n_features} features, but the model is expecting "
+                         f"{forest['n_features']} features as input.")
+    flat_X = X.ravel()
+    row_base = (np.arange(n) * n_features)[:, None]
+    feature, threshold, children = forest["feature"], forest["threshold"], forest["children"]
+    nodes = np.broadcast_to(forest["roots"], (n, len(forest["roots"])))
+    for _ in range(forest["max_depth"]):
+        go_left = flat_X.take(row_base + feature.take(nodes)) <= threshold.take(nodes)
+        nodes = children.take(2 * nodes + go_left)
+    return forest["value"].take(nodes, axis=0)
+
+
+# ── RandomForestClassifier ─────────────────────────────────────────────────────
+def compile_forest(model):
+    """Flatten every tree of a fitted RandomForestClassifier into shared arrays."""
+    forest = _flatten([est.tree_ for est in model.estimators_],
+                      model.n_features_in_, normalise=True)
+    forest["classes"] = np.asarray(model.classes_)
+    return forest
+
+
+def forest_proba(forest, X):
+    """Class probabilities for one or many rows, matching model.predict_proba."""
+    leaf_values = _leaf_values(forest, X)
+    # Accumulate tree by tree, in the same order as RandomForestClassifier
+    proba = np.zeros((leaf_values.shape[0], leaf_values.shape[2]))
+    for t in range(leaf_values.shape[1]):
+        proba += leaf_values[:, t]
+    return proba / leaf_values.shape[1]
+
+
+def forest_predict(forest, X):
+    """Predicted class for one or many rows, matching model.predict."""
+    return forest["classes"].take(np.argmax(forest_proba(forest, X), axis=1))
+
+
+def verify_forest(forest, model, X):
+    """True if the compiled forest reproduces model.predict exactly on X."""
+    return bool(np.array_equal(forest_predict(forest, X), model.predict(X)))
+
+
+# ── GradientBoostingRegressor ──────────────────────────────────────────────────
+def compile_boosting(model):
+    """Flatten every stage of a fitted single-output GradientBoostingRegressor."""
+    boosting = _flatten([est.tree_ for est in model.estimators_[:, 0]],
+                        model.n_features_in_, normalise=False)
+    boosting["init"] = float(model.init_.predict(np.zeros((1, model.n_features_in_)))[0])
+    boosting["learning_rate"] = float(model.learning_rate)
+    return boosting
+
+
+def boosting_predict(boosting, X):
+    """Regression output for one or many rows, matching model.predict."""
+    leaf_values = _leaf_values(boosting, X)
+    out = np.full(leaf_values.shape[0], boosting["init"])
+    # Stage by stage, in the same order as sklearn's predict_stages
+    for t in range(leaf_values.shape[1]):
+        out += boosting["learning_rate"] * leaf_values[:, t, 0]
+    return out
+
+
+def verify_boosting(boosting, model, X):
+    """True if the compiled ensemble reproduces model.predict exactly on X."""
+    return bool(np.array_equal(boosting_predict(boosting, X), model.predict(X)))
+
+
+# ── .npy round trip ────────────────────────────────────────────────────────────
+def split_arrays(compiled, prefix):
+    """Split a compiled ensemble into (arrays, scalars) for saving."""
+    arrays  = {f"{prefix}_{k}": v for k, v in compiled.items() if isinstance(v, np.ndarray)}
+    scalars = {f"{prefix}_{k}": v for k, v in compiled.items() if not isinstance(v, np.ndarray)}
+    return arrays, scalars
+
+
+def join_arrays(arrays, meta, prefix):
+    """Rebuild a compiled ensemble from (possibly memory-mapped) arrays and scalars."""
+    n = len(prefix) + 1
+    compiled = {k[n:]: v for k, v in arrays.items() if k.startswith(prefix + "_")}
+    compiled.update({k[n:]: v for k, v in meta.items() if k.startswith(prefix + "_")})
+    return compiled
@@ -2,8 +2,11 @@ import numpy as np
 import pandas as pd
 from sklearn.linear_model import LogisticRegression
 from sklearn.preprocessing import StandardScaler
-import pickle
-import os
+from models import registry, trainer, artifacts
+
+FEATURES  = ["sleep", "fatigue", "heart_rate", "workout_freq"]
+PARAMS    = {"max_iter": 500, "data_seed": 42}
+CONF_ATOL = 1e-12   # max confidence difference from predict_proba for the scorer to be used
 
 def generate_injury_data():
     np.random.seed(42)
@@ -19,30 +22,69 @@ def generate_injury_data():
         "heart_rate": heart_rate, "workout_freq": workout_freq, "risk": labels
     })
 
-def train_injury_model():
-    model_path = os.path.join(os.path.dirname(__file__), "injury_model.pkl")
-    if os.path.exists(model_path):
-        with open(model_path, "rb") as f:
-            return pickle.load(f)
+def compile_scorer(model, scaler):
+    """Fold the scaler's mean/scale into the LogisticRegression weights.
+
+    ((x - mean) / scale) @ W.T + b  ==  x @ (W / scale).T + (b - (mean / scale) @ W.T)
+    """
+    W = model.coef_ / scaler.scale_
+    b = model.intercept_ - (scaler.mean_ / scaler.scale_) @ model.coef_.T
+    return {"W": np.ascontiguousarray(W.T), "b": b, "classes": np.asarray(model.classes_)}
+
+def score(scorer, X):
+    """Single-pass class index and softmax probability for one or many rows."""
+    logits = np.atleast_2d(np.asarray(X, dtype=float)) @ scorer["W"] + scorer["b"]
+    logits -= logits.max(axis=1, keepdims=True)
+    proba = np.exp(logits)
+    proba /= proba.sum(axis=1, keepdims=True)
+    idx = proba.argmax(axis=1)
+    return scorer["classes"].take(idx), proba[np.arange(len(idx)), idx]
+
+def verify_scorer(scorer, model, scaler, X):
+    """True if the folded scorer matches model.predict / predict_proba on X."""
+    X_s = scaler.transform(X)
+    pred, conf = score(scorer, X)
+    return bool(np.array_equal(pred, model.predict(X_s)) and
+                np.allclose(conf, model.predict_proba(X_s).max(axis=1), rtol=0, atol=CONF_ATOL))
+
+def fit_model():
+    """Train the injury model on the synthetic dataset."""
     df = generate_injury_data()
-    X = df[["sleep", "fatigue", "heart_rate", "workout_freq"]]
+    X = df[FEATURES]
     y = df["risk"]
     scaler = StandardScaler()
     X_scaled = scaler.fit_transform(X)
-    model = LogisticRegression(max_iter=500)
+    model = LogisticRegression(max_iter=PARAMS["max_iter"])
     model.fit(X_scaled, y)
-    result = {"model": model, "scaler": scaler}
-    with open(model_path, "wb") as f:
-        pickle.dump(result, f)
-    return result
+    scorer = compile_scorer(model, scaler)
+    if not verify_scorer(scorer, model, scaler, X):
+        print("[FitAI] Injury scorer does not match the sklearn model; using predict_proba")
+        scorer = None
+    return {"model": model, "scaler": scaler, "scorer": scorer}
+
+def train_injury_model():
+    key = artifacts.artifact_key(None, FEATURES, PARAMS)
+    return trainer.load_or_train("injury", __name__, key)
+
+RISK_LABELS = {0: "Low", 1: "Medium", 2: "High"}
+RISK_COLORS = {0: "#00ffe7", 1: "#ffca28", 2: "#ff5252"}
+
+def predict_injury_risk_batch(rows):
+    """Predict (label, color, confidence) for a list of keyword dicts in one model call."""
+    if not rows:
+        return []
+    result = registry.get("injury")
+    X = np.array(
+        [[row["sleep"], row["fatigue"], row["heart_rate"], row.get("workout_freq", 4)] for row in rows],
+        dtype=float)
+    if result.get("scorer") is not None:
+        preds, confs = score(result["scorer"], X)
+    else:
+        probas = result["model"].predict_proba(result["scaler"].transform(X))
+        preds, confs = result["model"].classes_.take(probas.argmax(axis=1)), probas.max(axis=1)
+    return [(RISK_LABELS[pred], RISK_COLORS[pred], round(conf * 100, 1))
+            for pred, conf in zip(preds, confs)]
 
 def predict_injury_risk(sleep, fatigue, heart_rate, workout_freq=4):
-    result = train_injury_model()
-    model = result["model"]
-    scaler = result["scaler"]
-    X = scaler.transform([[sleep, fatigue, heart_rate, workout_freq]])
-    pred = model.predict(X)[0]
-    proba = model.predict_proba(X)[0]
-    labels = {0: "Low", 1: "Medium", 2: "High"}
-    colors = {0: "#00ffe7", 1: "#ffca28", 2: "#ff5252"}
-    return labels[pred], colors[pred], round(max(proba) * 100, 1)
+    return predict_injury_risk_batch([dict(sleep=sleep, fatigue=fatigue,
+                                           heart_rate=heart_rate, workout_freq=workout_freq)])[0]
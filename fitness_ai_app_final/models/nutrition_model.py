@@ -1,24 +1,12 @@
 import pandas as pd
-import numpy as np
-import pickle, os
-
-BASE_DIR   = os.path.dirname(__file__)
-DATA_PATH  = os.path.join(BASE_DIR, "..", "data", "food.csv")
-CACHE_PATH = os.path.join(BASE_DIR, "nutrition_data.pkl")
+from models import data_loader, food_search
 
 def load_real_dataset():
-    df = pd.read_csv(DATA_PATH)
-    df.columns = df.columns.str.strip().str.lower().str.replace(" ", "_")
-    name_col = next((c for c in df.columns if "name" in c or "descrip" in c), None)
-    cal_col  = next((c for c in df.columns if "calor" in c or "energy" in c), None)
-    prot_col = next((c for c in df.columns if "protein" in c), None)
-    carb_col = next((c for c in df.columns if "carb" in c), None)
-    fat_col  = next((c for c in df.columns if "fat" in c or "lipid" in c), None)
-    if not all([name_col, cal_col, prot_col]):
-        raise ValueError("Required columns not found")
-    df = df[[name_col, cal_col, prot_col, carb_col, fat_col]].dropna()
-    df.columns = ["name", "calories", "protein", "carbs", "fat"]
-    return df[df["calories"] > 0].head(500)
+    """The shared nutrition frame from data_loader (nutrition.csv, or the USDA food.csv)."""
+    df, ok = data_loader.load_nutrition()
+    if not ok:
+        raise ValueError("Nutrition dataset could not be loaded")
+    return df
 
 def get_synthetic_nutrition():
     foods = [
@@ -43,38 +31,24 @@ def get_synthetic_nutrition():
         ("Whole Milk (200ml)", 122, 6.4, 9.6, 6.4),
         ("Peanut Butter (30g)", 188, 8, 6, 16),
     ]
-    return pd.DataFrame(foods, columns=["name","calories","protein","carbs","fat"])
+    return pd.DataFrame(foods, columns=["food_name","calories","protein","carbs","fat"])
 
 def get_nutrition_data():
-    if os.path.exists(CACHE_PATH):
-        with open(CACHE_PATH, "rb") as f:
-            cached = pickle.load(f)
-        if os.path.exists(DATA_PATH) and not cached.get("real_data", False):
-            os.remove(CACHE_PATH)
-        else:
-            return cached
     using_real = False
-    if os.path.exists(DATA_PATH):
-        try:
-            df = load_real_dataset()
-            using_real = True
-        except:
-            df = get_synthetic_nutrition()
-    else:
+    try:
+        df = load_real_dataset()
+        using_real = True
+    except Exception:
         df = get_synthetic_nutrition()
-    result = {"data": df, "real_data": using_real, "n_samples": len(df)}
-    with open(CACHE_PATH, "wb") as f:
-        pickle.dump(result, f)
-    return result
+    return {"data": df, "real_data": using_real, "n_samples": len(df)}
 
 def search_foods(query="", top_n=10):
     result = get_nutrition_data()
     df = result["data"]
-    if query:
-        mask = df["name"].str.lower().str.contains(query.lower(), na=False)
-        filtered = df[mask].head(top_n)
-        if filtered.empty:
-            filtered = df.head(top_n)
-    else:
-        filtered = df.head(top_n)
+    rows = food_search.index_for(df).search(query, top_n) if query else []
+    filtered = df.iloc[rows] if len(rows) else df.head(top_n)
     return filtered, result["real_data"], result["n_samples"]
+
+def suggest_foods(prefix, limit=8):
+    """Completions of the word being typed in the food search box."""
+    return food_search.index_for(get_nutrition_data()["data"]).complete(prefix, limit)
@@ -0,0 +1,69 @@
+"""
+registry.py — Process-resident model registry for FitAI Pro
+Loads each trained model once per process and serves it from memory
+"""
+import importlib
+import threading
+from datetime import datetime
+
+# name -> (module, train function)
+MODELS = {
+    "workout":  ("models.workout_model",  "train_model"),
+    "calories": ("models.calories_model", "train_model"),
+    "injury":   ("models.injury_model",   "train_injury_model"),
+}
+
+_entries = {}
+_lock    = threading.Lock()
+_loads   = {name: 0 for name in MODELS}
+
+
+# ── Loading ────────────────────────────────────────────────────────────────────
+def _load(name):
+    module_name, func_name = MODELS[name]
+    train = getattr(importlib.import_module(module_name), func_name)
+    bundle = train()
+    _loads[name] += 1
+    return {
+        "bundle":      bundle,
+        "version":     _loads[name],
+        "fingerprint": bundle.get("version"),
+        "loaded_at":   datetime.utcnow().isoformat(timespec="seconds"),
+    }
+
+
+# ── Public API ─────────────────────────────────────────────────────────────────
+def get(name):
+    """Return the in-memory bundle for a model, loading it on first use."""
+    entry = _entries.get(name)
+    if entry is None:
+        with _lock:
+            entry = _entries.get(name)
+            if entry is None:
+                entry = _load(name)
+                _entries[name] = entry
+    return entry["bundle"]
+
+def load_all():
+    """Load every registered model. Called once per worker at startup."""
+    for name in MODELS:
+        get(name)
+
+def reload(names=None):
+    """Reload models from disk and swap them in atomically.
+
+    The new bundles are fully loaded before any of them replace the live ones,
+    so concurrent predictions see either the old set or the new set.
+    """
+    names = list(names or MODELS)
+    with _lock:
+        fresh = {name: _load(name) for name in names}
+        _entries.update(fresh)
+    return versions()
+
+def versions():
+    """Version and fingerprint of every loaded model."""
+    return {name: {"version":     e["version"],
+                   "fingerprint": e["fingerprint"],
+                   "loaded_at":   e["loaded_at"]}
+            for name, e in _entries.items()}
@@ -0,0 +1,129 @@
+"""
+trainer.py — Background retraining for FitAI Pro models
+Stale models keep serving while a fresh one is trained in a separate process,
+written to the artifact store and then swapped into the registry.
+"""
+import os
+import threading
+import time
+import importlib
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from models import artifacts
+
+LOCK_STALE_SECS = 15 * 60   # a lock older than this belongs to a crashed trainer
+
+_executor = None
+_pending  = set()
+_guard    = threading.Lock()
+
+
+# ── Cross-process training lock ────────────────────────────────────────────────
+def _try_lock(lock_path):
+    try:
+        fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+    except FileExistsError:
+        try:
+            if time.time() - os.path.getmtime(lock_path) > LOCK_STALE_SECS:
+                os.remove(lock_path)
+        except OSError:
+            pass
+        return False
+    os.write(fd, str(os.getpid()).encode())
+    os.close(fd)
+    return True
+
+@contextmanager
+def training_lock(path, blocking=True):
+    """Lock file next to the artifact so only one worker trains it at a time.
+
+    Yields True when the lock is held; with blocking=False yields False
+    immediately if another process is already training.
+    """
+    lock_path = path + ".lock"
+    os.makedirs(os.path.dirname(lock_path), exist_ok=True)
+    acquired = _try_lock(lock_path)
+    while not acquired and blocking:
+        time.sleep(0.5)
+        acquired = _try_lock(lock_path)
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            try:
+                os.remove(lock_path)
+            except OSError:
+                pass
+
+
+# ── Training ───────────────────────────────────────────────────────────────────
+def _fit_and_save(module, key, path):
+    result = module.fit_model()
+    result["version"] = key
+    artifacts.save_artifact(result, path, getattr(module, "to_arrays", None))
+    return result
+
+def load_or_train(name, module_name, key):
+    """Return the artifact for `key`, training it if needed.
+
+    If only an older version exists it keeps serving while the new one trains
+    in the background; with no artifact at all training happens inline.
+    """
+    artifacts.remove_legacy(name)
+    module = importlib.import_module(module_name)
+    from_arrays = getattr(module, "from_arrays", None)
+    path = artifacts.artifact_path(name, key)
+    result = artifacts.load_artifact(path, from_arrays)
+    if result is not None:
+        return result
+    stale = artifacts.latest_artifact(name, exclude=path, from_arrays=from_arrays)
+    if stale is not None:
+        retrain_in_background(name, module_name, key)
+        return stale
+    with training_lock(path):
+        # Another worker may have finished training while we waited
+        result = artifacts.load_artifact(path, from_arrays)
+        if result is None:
+            result = _fit_and_save(module, key, path)
+            if from_arrays is not None:
+                # Serve the memory-mapped copy, not the freshly fitted objects
+                result = artifacts.load_artifact(path, from_arrays) or result
+    return result
+
+
+# ── Background retraining ──────────────────────────────────────────────────────
+def _retrain(name, module_name, key):
+    """Runs in the worker process. Returns True once the artifact for `key` exists."""
+    path = artifacts.artifact_path(name, key)
+    with training_lock(path, blocking=False) as held:
+        if held:
+            _fit_and_save(importlib.import_module(module_name), key, path)
+            return True
+    # Another worker is already training — wait for it and pick up its artifact
+    with training_lock(path):
+        pass
+    return os.path.exists(path) or os.path.exists(path + ".pkl")
+
+def _on_done(name, future):
+    with _guard:
+        _pending.discard(name)
+    try:
+        swapped = future.result()
+    except Exception as e:
+        print(f"[FitAI] Background retrain of {name} failed: {e}")
+        return
+    if swapped:
+        from models import registry
+        registry.reload([name])
+
+def retrain_in_background(name, module_name, key):
+    """Train the artifact for `key` in a worker process; the stale one keeps serving."""
+    global _executor
+    with _guard:
+        if name in _pending:
+            return
+        _pending.add(name)
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=1)
+    future = _executor.submit(_retrain, name, module_name, key)
+    future.add_done_callback(lambda f: _on_done(name, f))
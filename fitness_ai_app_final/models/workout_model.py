@@ -1,35 +1,32 @@
 import numpy as np
-import pickle, os
+import os
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.preprocessing import LabelEncoder, StandardScaler
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import accuracy_score, classification_report
+from models import registry, trainer, artifacts, data_loader
+from models.forest import compile_forest, forest_predict, verify_forest, split_arrays, join_arrays
 
 BASE_DIR   = os.path.dirname(__file__)
-MODEL_PATH = os.path.join(BASE_DIR, "workout_model.pkl")
+CSV_PATH   = os.path.join(os.path.dirname(BASE_DIR), "data", "bodyPerformance.csv")
+FEATURES   = ["age", "height_cm", "weight_kg", "gender_enc", "situps", "broad_jump"]
+PARAMS     = {"n_estimators": 200, "max_depth": 10, "min_samples_split": 4, "random_state": 42}
 
-def train_model():
+def fit_model():
+    """Train a fresh workout model from the CSV, or synthetic data if it is missing."""
     from models.data_loader import load_body_performance, synthetic_nutrition_foods
     import sys
     sys.path.insert(0, os.path.dirname(BASE_DIR))
 
-    csv_exists = os.path.exists(os.path.join(os.path.dirname(BASE_DIR), "data", "bodyPerformance.csv"))
-
-    if os.path.exists(MODEL_PATH):
-        with open(MODEL_PATH, "rb") as f:
-            cached = pickle.load(f)
-        if csv_exists and not cached.get("real_data", False):
-            os.remove(MODEL_PATH)
-        else:
-            return cached
+    csv_exists = os.path.exists(CSV_PATH)
 
     using_real = False
     if csv_exists:
         try:
             df, ok = load_body_performance()
             if ok and df is not None:
-                X = df[["age", "height_cm", "weight_kg", "gender_enc", "situps", "broad_jump"]].values
-                y = df["workout_level"].values
+                X = df[FEATURES].to_numpy(dtype=float)
+                y = df["workout_level"].to_numpy(dtype=str)
                 using_real = True
         except Exception:
             pass
@@ -55,38 +52,77 @@ def train_model():
     X_train, X_test, y_train, y_test = train_test_split(
         X_sc, y_enc, test_size=0.2, random_state=42, stratify=y_enc)
 
-    model = RandomForestClassifier(n_estimators=200, max_depth=10,
-                                   min_samples_split=4, random_state=42, n_jobs=-1)
+    model = RandomForestClassifier(**PARAMS, n_jobs=-1)
     model.fit(X_train, y_train)
 
     acc    = round(accuracy_score(y_test, model.predict(X_test)) * 100, 1)
     report = classification_report(y_test, model.predict(X_test),
                                    target_names=le.classes_, output_dict=True)
 
-    result = {"model": model, "encoder": le, "scaler": scaler,
+    # Flat-array export of the forest; only kept if it matches model.predict exactly
+    forest = compile_forest(model)
+    if not verify_forest(forest, model, X_test):
+        forest = None
+
+    result = {"model": model, "encoder": le, "scaler": scaler, "forest": forest,
+              "scaler_mean": scaler.mean_, "scaler_scale": scaler.scale_,
+              "classes": np.asarray(le.classes_, dtype=str),
               "accuracy": acc, "report": report,
               "real_data": using_real, "n_samples": len(X)}
-    with open(MODEL_PATH, "wb") as f:
-        pickle.dump(result, f)
     return result
 
+def to_arrays(result):
+    """(arrays, meta) for the memory-mapped artifact, or None to pickle instead."""
+    if result.get("forest") is None:
+        return None
+    arrays, meta = split_arrays(result["forest"], "forest")
+    arrays.update({k: result[k] for k in ("scaler_mean", "scaler_scale", "classes")})
+    meta.update({k: result[k] for k in ("accuracy", "report", "real_data", "n_samples", "version")})
+    return arrays, meta
+
+def from_arrays(arrays, meta):
+    """Predict-capable bundle backed by memory-mapped arrays — no sklearn objects."""
+    result = {k: v for k, v in meta.items() if not k.startswith("forest_")}
+    result["forest"] = join_arrays(arrays, meta, "forest")
+    result.update({k: arrays[k] for k in ("scaler_mean", "scaler_scale", "classes")})
+    return result
+
+def train_model():
+    key = artifacts.artifact_key(CSV_PATH, FEATURES, {**PARAMS, "loader": data_loader.SNAPSHOT_FORMAT})
+    return trainer.load_or_train("workout", __name__, key)
+
 def get_model_stats():
-    r = train_model()
+    r = registry.get("workout")
     return {"accuracy": r.get("accuracy","N/A"),
             "real_data": r.get("real_data", False),
-            "n_samples": r.get("n_samples", 0)}
+            "n_samples": r.get("n_samples", 0),
+            "version":   r.get("version")}
+
+EXP_SITUPS = {"Beginner": 20, "Intermediate": 45, "Advanced": 70}
+EXP_JUMP   = {"Beginner": 150, "Intermediate": 200, "Advanced": 250}
+
+def workout_features(age, experience_level, weight=70, height=170, gender="Male"):
+    """Raw (unscaled) feature row used by the workout model."""
+    g_enc = 1 if gender == "Male" else 0
+    return [age, height, weight, g_enc,
+            EXP_SITUPS.get(experience_level, 30),
+            EXP_JUMP.get(experience_level, 180)]
+
+def predict_workout_levels(rows):
+    """Predict workout levels for a list of keyword dicts in one model call."""
+    if not rows:
+        return []
+    r = registry.get("workout")
+    X = np.array([workout_features(**row) for row in rows], dtype=float)
+    if r.get("forest") is None:
+        return list(r["encoder"].inverse_transform(r["model"].predict(r["scaler"].transform(X))))
+    X = (X - r["scaler_mean"]) / r["scaler_scale"]
+    return [str(level) for level in r["classes"].take(forest_predict(r["forest"], X))]
 
 def predict_workout_level(age, bmi, experience_level, goal, activity_level,
                           weight=70, height=170, gender="Male"):
-    r = train_model()
-    model, le, scaler = r["model"], r["encoder"], r["scaler"]
-    exp_situps = {"Beginner": 20, "Intermediate": 45, "Advanced": 70}
-    exp_jump   = {"Beginner": 150, "Intermediate": 200, "Advanced": 250}
-    g_enc = 1 if gender == "Male" else 0
-    X = scaler.transform([[age, height, weight, g_enc,
-                           exp_situps.get(experience_level, 30),
-                           exp_jump.get(experience_level, 180)]])
-    return le.inverse_transform(r["model"].predict(X))[0]
+    return predict_workout_levels([dict(age=age, experience_level=experience_level,
+                                        weight=weight, height=height, gender=gender)])[0]
 
 WORKOUT_PLANS = {
     "Beginner": {
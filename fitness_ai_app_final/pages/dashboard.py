@@ -2,8 +2,10 @@ import streamlit as st
 import plotly.graph_objects as go
 import numpy as np
 import sys, os
+from datetime import date
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 from models.data_loader import exercise_load, get_dataset_status
+from data_access import workout_timeseries
 
 def show():
     st.markdown("""
@@ -62,27 +64,51 @@ def show():
     days    = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
     np.random.seed(42)
 
-    # ── Load exercise dataset for calorie chart ───────────────────────────────
     ex_df, ex_real = exercise_load()
 
-    if ex_real and ex_df is not None and "calories" in ex_df.columns:
+    # ── Calories from the user's logged workouts (backend time series) ────────
+    series = None
+    if st.session_state.get("logged_in"):
+        view = st.radio("Calories view", ["Daily", "Weekly", "Monthly"],
+                        horizontal=True, label_visibility="collapsed")
+        bucket = {"Daily": "day", "Weekly": "week", "Monthly": "month"}[view]
+        data, ok = workout_timeseries(bucket)
+        if ok and any(p["sessions"] for p in data.get("points", [])):
+            series = data
+
+    if series:
+        points = series["points"]
+        if bucket == "day":
+            labels = [days[date.fromisoformat(p["period"]).weekday()] for p in points]
+        elif bucket == "week":
+            labels = [date.fromisoformat(p["period"]).strftime("%d %b") for p in points]
+        else:
+            labels = [date.fromisoformat(p["period"]).strftime("%b %Y") for p in points]
+        cal_burned = [int(p["calories"]) for p in points]
+        cal_title  = {"day": "Calories Burned — Last 7 Days", "week": "Calories Burned per Week",
+                      "month": "Calories Burned per Month"}[bucket]
+        cal_source = "Your Workout Log"
+    # ── Fallback: exercise dataset sample or TDEE estimate ────────────────────
+    elif ex_real and ex_df is not None and "calories" in ex_df.columns:
         # Sample 7 rows to simulate a week
         sample = ex_df.sample(min(7, len(ex_df)), random_state=42)
         cal_burned = sample["calories"].astype(int).tolist()
         while len(cal_burned) < 7:
             cal_burned.append(int(ex_df["calories"].mean()))
         cal_burned = cal_burned[:7]
+        labels, cal_title = days, "Calories Burned This Week"
         cal_source = "Real Exercise Dataset"
     else:
         base = u.get("tdee", 2000)
         cal_burned = [int(base * x) for x in np.random.uniform(0.3, 0.65, 7)]
+        labels, cal_title = days, "Calories Burned This Week"
         cal_source = "Estimated"
 
     # Calories bar chart
     fig1 = go.Figure()
     avg = np.mean(cal_burned)
     fig1.add_trace(go.Bar(
-        x=days, y=cal_burned,
+        x=labels, y=cal_burned,
         marker=dict(color=["#00ffe7" if c >= avg else "#1a2a45" for c in cal_burned]),
         hovertemplate="<b>%{x}</b><br>%{y} kcal<extra></extra>"
     ))
@@ -90,7 +116,7 @@ def show():
                    annotation_text=f"Avg: {int(avg)} kcal", annotation_font_color="#ff6b35",
                    annotation_font_size=10)
     fig1.update_layout(
-        title=dict(text=f"Calories Burned This Week ({cal_source})",
+        title=dict(text=f"{cal_title} ({cal_source})",
                    font=dict(family="Orbitron", color="white", size=12)),
         paper_bgcolor=PLOT_BG, plot_bgcolor=SURFACE,
         font=dict(color="#5a7a99"),
@@ -2,6 +2,7 @@ import streamlit as st
 import sys, os
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 from models.data_loader import load_nutrition, synthetic_nutrition_foods
+from models.food_search import index_for
 
 MEAL_PLANS = {
     "Weight Loss":       {"calorie_adjust": -500, "protein_ratio": 0.35, "carb_ratio": 0.40, "fat_ratio": 0.25},
@@ -115,8 +116,7 @@ def show():
     search = st.text_input("Search food item", placeholder="e.g. chicken, rice, egg, banana...")
 
     if search:
-        mask = nutrition_df["food_name"].str.contains(search, case=False, na=False)
-        results = nutrition_df[mask].head(10)
+        results = nutrition_df.iloc[index_for(nutrition_df).search(search, 10)]
         if len(results) > 0:
             for _, row in results.iterrows():
                 st.markdown(f"""
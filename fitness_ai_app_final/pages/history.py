@@ -1,7 +1,8 @@
 import streamlit as st
 import sys, os
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
-from api_client import log_workout, get_workout_history, get_workout_stats, delete_workout, check_backend
+from api_client import check_backend
+from data_access import history_page, log_workout, delete_workout
 
 EXERCISES = [
     "Squat", "Deadlift", "Bench Press", "Pull-ups", "Push-ups",
@@ -26,12 +27,13 @@ def show():
         st.warning("⚠️ Please login first to track your workouts.")
         return
 
+    # Cached health — returns at once; the probe retries in the background
     if not check_backend():
         st.error("❌ Backend not running. Start it with: `uvicorn main:app --reload` in the backend folder.")
         return
 
-    # ── Stats from backend ────────────────────────────────────────────────────
-    stats, ok = get_workout_stats()
+    # ── Stats and history from backend (fetched together, cached per user) ───
+    (stats, ok), (history, history_ok) = history_page()
     if ok and stats.get("total_sessions", 0) > 0:
         c1, c2, c3, c4 = st.columns(4)
         c1.metric("Total Sessions",  stats.get("total_sessions", 0))
@@ -77,8 +79,7 @@ def show():
     text-transform:uppercase; margin-bottom:0.8rem;">Recent Sessions (from Database)</div>""",
     unsafe_allow_html=True)
 
-    history, ok = get_workout_history()
-    if ok and history:
+    if history_ok and history:
         for entry in history:
             col1, col2 = st.columns([5, 1])
             with col1:
@@ -106,7 +107,7 @@ def show():
                 if st.button("🗑️", key=f"del_{entry['id']}"):
                     delete_workout(entry["id"])
                     st.rerun()
-    elif ok:
+    elif history_ok:
         st.markdown("""
         <div style="text-align:center; color:#5a7a99; padding:2rem;">
             No workouts logged yet. Log your first session above! 💪
@@ -2,7 +2,6 @@ import streamlit as st
 import sys, os
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 from api_client import register, login, check_backend
-```
 
 def show():
     st.markdown("""
@@ -1,7 +1,7 @@
 import streamlit as st
 import sys, os
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
-from models.nutrition_model import search_foods, get_nutrition_data
+from models.nutrition_model import search_foods, suggest_foods, get_nutrition_data
 import plotly.graph_objects as go
 
 def show():
@@ -33,7 +33,7 @@ def show():
         <div style="background:rgba(255,202,40,0.05); border:1px solid rgba(255,202,40,0.2);
                     border-radius:8px; padding:0.8rem 1.2rem; margin-bottom:1rem;">
             <span style="color:#ffca28; font-size:0.8rem;">
-                ⚙️ Using built-in nutrition table. Add <b>food.csv</b> to <b>data/</b> folder for full USDA database.
+                ⚙️ Using built-in nutrition table. Add <b>nutrition.csv</b> or the USDA <b>food.csv</b> to <b>data/</b> folder for full USDA database.
                 Dataset: <a style="color:#ffca28;" href="https://www.kaggle.com/datasets/thedevastator/usda-nutrition-database" target="_blank">Kaggle Link</a>
             </span>
         </div>
@@ -42,6 +42,9 @@ def show():
     # Search
     query = st.text_input("🔍  Search food", placeholder="e.g. chicken, rice, egg, paneer...")
     foods_df, real, n = search_foods(query, top_n=10)
+    suggestions = [s for s in suggest_foods(query) if s != query.strip().lower()] if query else []
+    if suggestions:
+        st.caption("Suggestions: " + " · ".join(suggestions[:5]))
 
     st.markdown("""
     <div style="color:#5a7a99; font-size:0.7rem; letter-spacing:3px; text-transform:uppercase; margin:1rem 0 0.8rem;">
@@ -64,7 +67,7 @@ def show():
                     border-radius:0 8px 8px 0; padding:0.8rem 1.2rem;
                     margin-bottom:0.5rem; display:flex; justify-content:space-between; align-items:center;">
             <div>
-                <div style="color:white; font-size:0.85rem; font-weight:500;">{row['name']}</div>
+                <div style="color:white; font-size:0.85rem; font-weight:500;">{row['food_name']}</div>
             </div>
             <div style="display:flex; gap:1.5rem; text-align:center;">
                 <div>
@@ -90,7 +93,7 @@ def show():
     # Macro comparison chart for top 5
     if len(foods_df) >= 3:
         st.markdown("<br>", unsafe_allow_html=True)
-        names  = [r["name"][:20] for _, r in foods_df.head(5).iterrows()]
+        names  = [r["food_name"][:20] for _, r in foods_df.head(5).iterrows()]
         prots  = [round(float(r["protein"]), 1) for _, r in foods_df.head(5).iterrows()]
         carbs_ = [round(float(r.get("carbs", 0)), 1) for _, r in foods_df.head(5).iterrows()]
         fats_  = [round(float(r.get("fat", 0)), 1) for _, r in foods_df.head(5).iterrows()]
@@ -0,0 +1,64 @@
+"""
+Parity of the folded injury scorer with the sklearn model it was compiled from.
+score() must give the same labels as model.predict and the same confidence as
+predict_proba(...).max(1) to within CONF_ATOL, for single rows and batches,
+in and out of range.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from models import injury_model
+from models.injury_model import FEATURES, CONF_ATOL, score
+
+
+@pytest.fixture(scope="module")
+def fitted():
+    return injury_model.fit_model()
+
+def sklearn_predict(fitted, X):
+    X_s = fitted["scaler"].transform(pd.DataFrame(X, columns=FEATURES))
+    return fitted["model"].predict(X_s), fitted["model"].predict_proba(X_s).max(axis=1)
+
+def random_rows(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return np.column_stack([rng.uniform(3, 10, n), rng.integers(1, 11, n),
+                            rng.integers(55, 120, n), rng.integers(0, 8, n)]).astype(float)
+
+def out_of_range_rows(n, seed=1):
+    rng = np.random.default_rng(seed)
+    X = rng.uniform(-1000, 1000, (n, len(FEATURES)))
+    edges = np.array([[0, 0, 0, 0], [24, 10, 220, 14], [-5, -5, -5, -5], [1e6, 1e6, 1e6, 1e6]], dtype=float)
+    return np.vstack([X, edges])
+
+ROWS = {"random": random_rows(5000), "out_of_range": out_of_range_rows(1000)}
+
+
+def test_fit_model_keeps_verified_scorer(fitted):
+    assert fitted["scorer"] is not None
+
+@pytest.mark.parametrize("kind", ROWS)
+def test_batch_matches_sklearn(fitted, kind):
+    X = ROWS[kind]
+    labels, conf = score(fitted["scorer"], X)
+    expected_labels, expected_conf = sklearn_predict(fitted, X)
+    np.testing.assert_array_equal(labels, expected_labels)
+    np.testing.assert_allclose(conf, expected_conf, rtol=0, atol=CONF_ATOL)
+
+@pytest.mark.parametrize("kind", ROWS)
+def test_single_row_matches_sklearn(fitted, kind):
+    X = ROWS[kind][:200]
+    expected_labels, expected_conf = sklearn_predict(fitted, X)
+    for row, label, conf in zip(X, expected_labels, expected_conf):
+        got_label, got_conf = score(fitted["scorer"], row)
+        assert got_label.shape == got_conf.shape == (1,)
+        assert got_label[0] == label
+        assert got_conf[0] == pytest.approx(conf, rel=0, abs=CONF_ATOL)
+
+def test_batch_endpoint_path_matches_sklearn(fitted, monkeypatch):
+    monkeypatch.setattr(injury_model.registry, "get", lambda name: fitted)
+    X = ROWS["random"][:500]
+    rows = [dict(zip(FEATURES, r)) for r in X]
+    expected_labels, expected_conf = sklearn_predict(fitted, X)
+    results = injury_model.predict_injury_risk_batch(rows)
+    assert [r[0] for r in results] == [injury_model.RISK_LABELS[l] for l in expected_labels]
+    assert [r[2] for r in results] == [round(c * 100, 1) for c in expected_conf]